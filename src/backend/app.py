@@ -2,43 +2,79 @@
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import base64
-import io
-import numpy as np
-from PIL import Image
+from PIL import Image, ImageDraw
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from time import perf_counter, time_ns
+from concurrent.futures import ThreadPoolExecutor
 import os
-import cv2
 
 # Import real model components (YOLO only)
 from .models.real_model_loader import real_model_loader as model_loader
+from .models.inference_queue import InferenceQueue
 
 print("✅ Using real YOLO model")
 
 from .utils.response_formatter import ResponseFormatter
 from .utils.image_processing import ImageProcessor
+from .utils.result_cache import (
+    REDIS_AVAILABLE,
+    ContentResultCache,
+    PerceptualResultCache,
+    RedisResultCache,
+)
+from .utils.json_provider import OrjsonProvider
+from .utils.image_writer import ImageWriter
 
 # Helper functions for class name handling
 import re
+from functools import lru_cache
+
+# CamelCase word boundary ("SafeDriving" -> "Safe|Driving"), compiled once
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
 
 
+# Only a handful of class names exist - cache the regex/replace work
+@lru_cache(maxsize=64)
 def _normalize_class_name(name: str) -> str:
     s = str(name or "").strip()
-    s = re.sub(r"([a-z0-9])([A-Z])", r"\1-\2", s)
+    s = _CAMEL_RE.sub(r"\1-\2", s)
     s = s.replace("_", "-").replace(" ", "-")
     return s.lower()
 
 
+@lru_cache(maxsize=64)
 def _humanize_class_name(name: str) -> str:
     # Convert CamelCase to spaced words then title-case
-    s = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", str(name or "").strip())
+    s = _CAMEL_RE.sub(r"\1 \2", str(name or "").strip())
     s = s.replace("-", " ").replace("_", " ")
     return s.lower()
 
 
+# Models accepted by the single-image endpoints
+AVAILABLE_MODELS = frozenset({"yolo", "auto"})
+AVAILABLE_MODELS_MSG = "Available models: ['yolo', 'auto']"
+
+# Alert (level, message template) per detection category (is_drowsy)
+ALERT_TABLE = {
+    "drowsy": ("high", "Drowsiness detected: %s! Immediate attention required."),
+    "distracted": ("medium", "Driver distracted: %s detected. Stay focused."),
+    "safety-violation": (
+        "critical",
+        "Safety violation: %s detected! Pull over immediately.",
+    ),
+}
+SAFE_ALERT = ("none", "Driver appears %s. Continue monitoring.")
+
+# Drowsy classes that get the more direct message
+DROWSY_CLASS_NAMES = frozenset({"sleepy-driving", "yawning", "sleepy", "yawn"})
+DROWSY_CLASS_ALERT = ("high", "Driver is %s! Immediate attention required.")
+
+
 # Initialize Flask app
 app = Flask(__name__)
+# jsonify / request.get_json go through orjson
+app.json = OrjsonProvider(app)
 
 # Configure CORS to allow all origins for development
 CORS(
@@ -54,8 +90,14 @@ CORS(
     supports_credentials=False,
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging - per-request INFO logs only in development (DEBUG=True)
+logging.basicConfig(
+    level=(
+        logging.INFO
+        if os.getenv("DEBUG", "True").lower() == "true"
+        else logging.WARNING
+    )
+)
 logger = logging.getLogger(__name__)
 
 # Initialize components
@@ -64,28 +106,103 @@ print("🚀 Real model loader initialized")
 response_formatter = ResponseFormatter()
 image_processor = ImageProcessor()
 
-# Models are loaded by the real_model_loader singleton on import
+# Oversized frames are rejected before they are decoded (encoded image bytes;
+# base64 payloads are checked against the inflated 4/3 length first)
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 6 * 1024 * 1024))
+MAX_B64_BYTES = MAX_IMAGE_BYTES * 4 // 3 + 256  # + data URL prefix / padding
+
+# Whole-body cap (a full batch of 10 base64 images plus JSON overhead):
+# Werkzeug refuses larger bodies with 413 before they are read or parsed
+app.config["MAX_CONTENT_LENGTH"] = 10 * MAX_B64_BYTES + 64 * 1024
+
+# Large JPEGs are decoded at a reduced scale that still covers the YOLO input
+# size (bboxes are mapped back to full resolution); 0 disables
+_draft = int(os.getenv("JPEG_DRAFT_SIZE", 640))
+DRAFT_SIZE = (_draft, _draft) if _draft > 0 else None
+
+# Identical image bytes (retries, replays) reuse the previous result.
+# With REDIS_URL set the cache lives in Redis and is shared by all workers.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL and REDIS_AVAILABLE and int(os.getenv("CONTENT_CACHE_SIZE", 1024)) > 0:
+    content_cache = RedisResultCache(
+        REDIS_URL, ttl=float(os.getenv("CONTENT_CACHE_TTL", 30))
+    )
+else:
+    if REDIS_URL and not REDIS_AVAILABLE:
+        logger.warning(
+            "REDIS_URL is set but redis is not installed - using local cache"
+        )
+    content_cache = ContentResultCache(
+        maxsize=int(os.getenv("CONTENT_CACHE_SIZE", 1024)),
+        ttl=float(os.getenv("CONTENT_CACHE_TTL", 30)),
+    )
+
+# Batch images are base64/JPEG decoded in parallel (both release the GIL)
+# (one worker per core, capped at 8 - batches hold at most 10 images)
+decode_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DECODE_WORKERS", min(8, os.cpu_count() or 1))),
+    thread_name_prefix="decode",
+)
+
+# Near-duplicate frames of one session (same model) may reuse the previous
+# result for up to RESULT_CACHE_TTL seconds - off unless RESULT_CACHE_SIZE > 0
+result_cache = PerceptualResultCache(
+    maxsize=int(os.getenv("RESULT_CACHE_SIZE", 0)),
+    max_distance=int(os.getenv("RESULT_CACHE_MAX_DISTANCE", 5)),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", 1.0)),
+)
+
+# Concurrent /api/detect requests are coalesced into batched forward passes
+inference_queue = InferenceQueue(
+    model_loader,
+    max_batch=int(os.getenv("BATCH_MAX_SIZE", 8)),
+    max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", 5)),
+)
+
+# Annotated images are drawn and written on a background thread; the writer
+# creates DETECTIONS_DIR on first use (no getenv / mkdir per request)
+DETECTIONS_DIR = os.getenv("DETECTIONS_DIR", os.path.join("outputs", "detections"))
+image_writer = ImageWriter(max_pending=int(os.getenv("SAVE_QUEUE_SIZE", 32)))
+
+# Models are loaded by the real_model_loader singleton on import;
+# warm them up so the first request doesn't pay CUDA init / cuDNN autotune
 try:
     print("✅ Real models loaded from singleton instance")
+    if os.getenv("MODEL_WARMUP", "True").lower() == "true":
+        model_loader.warmup(runs=int(os.getenv("MODEL_WARMUP_RUNS", 2)))
 except Exception as e:
     print(f"❌ Error loading real models: {e}")
 
 
+HEALTH_INFO = {
+    "server": "Flask Development Server",
+    "mode": "real",
+    "version": "1.0.0",
+}
+
+
+@lru_cache(maxsize=1)
+def _models_summary(model_names):
+    """
+    Loaded model names and their class information, keyed by the loaded
+    model set so probes and /api/models don't rebuild it on every call
+    (a different set of loaded models simply misses the cache)
+    """
+    model_infos = [model_loader.get_model_info(name) for name in model_names]
+    return list(model_names), [info for info in model_infos if info]
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """
     Health check endpoint
     """
-    models_loaded = list(model_loader.models.keys())
+    models_loaded, _ = _models_summary(tuple(model_loader.models))
     return jsonify(
         response_formatter.format_health_response(
             status="healthy",
             models_loaded=models_loaded,
-            additional_info={
-                "server": "Flask Development Server",
-                "mode": "real",
-                "version": "1.0.0",
-            },
+            additional_info=HEALTH_INFO,
         )
     )
 
@@ -94,20 +211,256 @@ def health_check():
 def get_available_models():
     """Get list of available models with class information"""
     try:
-        models = model_loader.get_all_models()
-
-        # Add class information for each model
-        models_with_classes = []
-        for model_name in models:
-            model_info = model_loader.get_model_info(model_name)
-            if model_info:
-                models_with_classes.append(model_info)
-
+        _, models_with_classes = _models_summary(tuple(model_loader.models))
         return jsonify(response_formatter.format_models_response(models_with_classes))
     except Exception as e:
         return jsonify(response_formatter.format_error_response(str(e))), 500
 
 
+def _infer_with_cache(pil_image, model_name, image_digest=None, session_id=None):
+    """
+    Run inference through the perceptual result cache (near-duplicate frames
+    of the same session - anonymous requests never share perceptual results)
+    and store the result under `image_digest` in the exact-bytes cache, which
+    _detect_single checks before decoding.
+    """
+    raw_result = None
+    use_perceptual = result_cache.enabled and session_id is not None
+    image_hash = image_processor.dhash(pil_image) if use_perceptual else None
+    result = (
+        result_cache.get(session_id, model_name, image_hash) if use_perceptual else None
+    )
+    if result is not None:
+        result["timestamp"] = datetime.now().isoformat()
+        logger.info("Result cache hit for near-duplicate frame")
+    else:
+        result = inference_queue.detect_drowsiness(pil_image, model_name)
+        _restore_bbox_scale(result, pil_image)
+        # The caches only hold the plain result, never the model's raw output
+        raw_result = result.pop("raw_result", None)
+        if use_perceptual:
+            result_cache.put(session_id, model_name, image_hash, result)
+
+    if image_digest is not None:
+        content_cache.put(model_name, image_digest, result)
+    if raw_result is not None:
+        result["raw_result"] = raw_result
+    return result
+
+
+def _restore_bbox_scale(result, pil_image):
+    """Map a result bbox from a draft-decoded frame back to full resolution"""
+    original_size = pil_image.info.get("original_size")
+    if original_size and result.get("bbox"):
+        result["bbox"] = image_processor.scale_bbox(
+            result["bbox"], pil_image.size, original_size
+        )
+
+
+def _draw_bbox(pil_image, bbox):
+    """Draw one bbox on an RGB copy of the frame (runs on the writer thread)"""
+    # bbox is in full-resolution coordinates, the frame may be draft-decoded
+    original_size = pil_image.info.get("original_size")
+    if original_size:
+        bbox = image_processor.scale_bbox(bbox, original_size, pil_image.size)
+    x = int(bbox.get("x", 0))
+    y = int(bbox.get("y", 0))
+    w = int(bbox.get("width", 0))
+    h = int(bbox.get("height", 0))
+
+    # Draw on one RGB copy and let PIL encode it - no numpy
+    # round trip or BGR conversion (convert() always copies)
+    annotated = pil_image.convert("RGB")
+    ImageDraw.Draw(annotated).rectangle(
+        (x, y, x + w, y + h), outline=(0, 255, 0), width=2
+    )
+    return annotated
+
+
+def _draw_detections(raw_result):
+    """Draw every YOLO box with its label (runs on the writer thread)"""
+    # Results.plot() runs Ultralytics' Annotator (per-box colors, label
+    # backgrounds, font handling); a rectangle and a label per box is enough
+    # for the saved image. orig_img is the frame the model saw - the loader
+    # passes RGB arrays (PIL / TurboJPEG), so it is saved without a channel
+    # flip, in true colour like the _draw_bbox fallback.
+    annotated = Image.fromarray(raw_result.orig_img)
+    boxes = raw_result.boxes
+    if boxes is not None and len(boxes):
+        draw = ImageDraw.Draw(annotated)
+        for (x1, y1, x2, y2), class_id, conf in zip(
+            boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist()
+        ):
+            label = f"{raw_result.names.get(int(class_id), int(class_id))} {conf:.2f}"
+            draw.rectangle((x1, y1, x2, y2), outline=(0, 255, 0), width=2)
+            draw.text((x1, max(y1 - 12, 0)), label, fill=(0, 255, 0))
+    return annotated
+
+
+def _image_too_large_response():
+    return (
+        jsonify(
+            response_formatter.format_error_response(
+                f"Image too large (max {MAX_IMAGE_BYTES} bytes)", "PAYLOAD_TOO_LARGE"
+            )
+        ),
+        413,
+    )
+
+
+def _detect_single(image_bytes, model_name, session_id, confidence_threshold):
+    """
+    Validate parameters, decode and run inference on one image and build the
+    detection response. Shared by /api/detect and /api/detect/raw.
+    """
+    # Validate model name
+    if model_name not in AVAILABLE_MODELS:
+        return (
+            jsonify(
+                response_formatter.format_error_response(
+                    f"Model {model_name} not available. {AVAILABLE_MODELS_MSG}"
+                )
+            ),
+            400,
+        )
+
+    # Validate confidence threshold
+    if confidence_threshold < 0.0 or confidence_threshold > 1.0:
+        return (
+            jsonify(
+                response_formatter.format_error_response(
+                    "confidence_threshold must be between 0.0 and 1.0"
+                )
+            ),
+            400,
+        )
+
+    # Exact-bytes cache first: a hit skips the pixel decode entirely
+    image_digest = content_cache.digest(image_bytes) if content_cache.enabled else None
+    cached = (
+        content_cache.get(model_name, image_digest)
+        if image_digest is not None
+        else None
+    )
+
+    pil_image = None
+    if cached is not None:
+        cached["timestamp"] = datetime.now().isoformat()
+        logger.info("Result cache hit for identical frame")
+    else:
+        try:
+            pil_image = image_processor.open_image(image_bytes, DRAFT_SIZE)
+            # Force the pixel decode here so a corrupt image is rejected with a
+            # 400 instead of failing in (and with) a batched forward pass
+            pil_image.load()
+        except Exception as e:
+            return (
+                jsonify(
+                    response_formatter.format_error_response(
+                        f"Invalid image data: {str(e)}"
+                    )
+                ),
+                400,
+            )
+
+    # Run inference using the unified method
+    start_time = perf_counter()
+
+    try:
+        if cached is not None:
+            result = cached
+        else:
+            result = _infer_with_cache(pil_image, model_name, image_digest, session_id)
+        inference_time = perf_counter() - start_time
+
+        # Apply confidence threshold
+        if result.get("confidence", 0) < confidence_threshold:
+            result["is_drowsy"] = "unknown"
+            result["class_name"] = "unknown"
+            logger.info(
+                "Result filtered by confidence threshold: %s < %s",
+                result.get("confidence", 0),
+                confidence_threshold,
+            )
+
+        # Add session and timing info
+        result["sessionId"] = session_id
+        result["inference_time_seconds"] = round(inference_time, 3)
+        result["confidence_threshold"] = confidence_threshold
+
+        # Create alert level based on normalized class name
+        cls_norm = _normalize_class_name(result["class_name"])
+        cls_human = _humanize_class_name(result["class_name"])
+
+        # Check category from is_drowsy field (now returns 4-class string)
+        category = result["is_drowsy"]
+
+        if category == "drowsy" and cls_norm in DROWSY_CLASS_NAMES:
+            alert_level, alert_template = DROWSY_CLASS_ALERT
+        else:
+            alert_level, alert_template = ALERT_TABLE.get(category, SAFE_ALERT)
+        alert_message = alert_template % cls_human
+
+        result["alert_level"] = alert_level
+        result["alert_message"] = alert_message
+
+        raw_result = result.pop("raw_result", None)
+
+        # Save annotated image to outputs/detections
+        try:
+            # Nanosecond epoch stamp - unique per request, no strftime
+            filename = f"{model_name}_{time_ns()}.jpg"
+            save_path = os.path.join(DETECTIONS_DIR, filename)
+            logger.info("📸 Queueing annotated image for: %s", save_path)
+
+            if raw_result is not None:
+                # Reuse the Results from the inference pass (YOLO)
+                render = lambda: _draw_detections(raw_result)
+            elif result.get("bbox"):
+                # Cached result or non-YOLO model: draw the best bbox
+                logger.info("🔧 Queueing bbox drawing for model: %s", model_name)
+                bbox = result["bbox"]
+                if pil_image is None:
+                    # Exact-bytes hit: decode the frame on the writer thread
+                    render = lambda: _draw_bbox(
+                        image_processor.open_image(image_bytes, DRAFT_SIZE), bbox
+                    )
+                else:
+                    render = lambda: _draw_bbox(pil_image, bbox)
+            else:
+                render = None
+
+            # The file is written after the response is sent
+            if render is not None:
+                if image_writer.submit(save_path, render):
+                    result["saved_image_path"] = save_path
+            else:
+                logger.warning("⚠️ No bbox available, cannot save annotated image")
+        except Exception as save_err:
+            logger.error(
+                "❌ Failed to save annotated image: %s", save_err, exc_info=True
+            )
+
+        logger.info(
+            "Detection completed: %s (confidence: %.2f)",
+            result.get("class_name", "unknown"),
+            result.get("confidence", 0),
+        )
+
+        return jsonify(response_formatter.format_detection_response(result))
+
+    except Exception as e:
+        logger.error("Detection error: %s", e)
+        return (
+            jsonify(
+                response_formatter.format_error_response(
+                    f"Detection failed: {str(e)}"
+                )
+            ),
+            500,
+        )
+
+
 @app.route("/api/detect", methods=["POST"])
 def detect_drowsiness():
     """
@@ -116,19 +469,19 @@ def detect_drowsiness():
     JSON format:
     {
         "image": "base64_encoded_image",
-        "model": "yolo" (optional, default: yolo),
+        "model": "yolo" | "auto" (optional, default: yolo),
         "sessionId": "optional_session_id",
         "confidence_threshold": 0.5 (optional)
     }
 
     Form-data format (from Postman):
     - image: file upload
-    - model: yolo (optional, default: yolo)
+    - model: yolo | auto (optional, default: yolo)
     - sessionId: optional_session_id (optional)
     - confidence_threshold: 0.5 (optional)
     """
     try:
-        pil_image = None
+        image_bytes = None
         model_name = "yolo"
         session_id = None
         confidence_threshold = 0.5
@@ -167,11 +520,18 @@ def detect_drowsiness():
             session_id = request.form.get("sessionId")
             confidence_threshold = float(request.form.get("confidence_threshold", 0.5))
 
-            # Read image file directly
+            # Read image file directly (one byte past the limit is enough to tell)
+            image_bytes = file.read(MAX_IMAGE_BYTES + 1)
+            if len(image_bytes) > MAX_IMAGE_BYTES:
+                return _image_too_large_response()
+
             try:
-                pil_image = Image.open(file.stream)
+                # Header only - the pixels are decoded once parameters check out
+                image_format, width, height = image_processor.sniff_image(image_bytes)
                 logger.info(
-                    f"Received image from form-data: {pil_image.size}, format: {pil_image.format}"
+                    "Received image from form-data: %s, format: %s",
+                    (width, height),
+                    image_format,
                 )
             except Exception as e:
                 return (
@@ -186,7 +546,9 @@ def detect_drowsiness():
         else:
             # Handle JSON request
             logger.info("Handling JSON request")
-            data = request.get_json()
+            # Parsed by orjson (app.json); cache=False keeps Werkzeug from
+            # holding a second copy of the multi-MB body
+            data = request.get_json(silent=True, cache=False)
 
             if not data or "image" not in data:
                 return (
@@ -204,19 +566,25 @@ def detect_drowsiness():
             session_id = data.get("sessionId")
             confidence_threshold = float(data.get("confidence_threshold", 0.5))
 
+            if len(image_data) > MAX_B64_BYTES:
+                return _image_too_large_response()
+
             # Simple validation of base64 image data
             try:
-                # Remove data URL prefix if present
-                if "," in image_data:
-                    image_data = image_data.split(",")[1]
-
-                # Try to decode base64
-                decoded_data = base64.b64decode(image_data)
-
-                # Try to open as PIL image
-                pil_image = Image.open(io.BytesIO(decoded_data))
+                # Decode base64 (data URL prefix is stripped if present)
+                image_bytes = image_processor.decode_base64(image_data)
+                # Free the base64 text (4/3 of the image) before inference
+                # instead of holding it until the response is sent
+                del data, image_data
+                if len(image_bytes) > MAX_IMAGE_BYTES:
+                    return _image_too_large_response()
+
+                # Header only - the pixels are decoded once parameters check out
+                image_format, width, height = image_processor.sniff_image(image_bytes)
                 logger.info(
-                    f"Received image from JSON: {pil_image.size}, format: {pil_image.format}"
+                    "Received image from JSON: %s, format: %s",
+                    (width, height),
+                    image_format,
                 )
 
             except Exception as e:
@@ -229,180 +597,89 @@ def detect_drowsiness():
                     400,
                 )
 
-        # Validate model name
-        available_models = ["yolo"]
-        if model_name not in available_models:
-            return (
-                jsonify(
-                    response_formatter.format_error_response(
-                        f"Model {model_name} not available. Available models: {available_models}"
-                    )
-                ),
-                400,
-            )
+        return _detect_single(image_bytes, model_name, session_id, confidence_threshold)
+
+    except Exception as e:
+        logger.error("Error in detection: %s", e)
+        return (
+            jsonify(response_formatter.format_error_response("Internal server error")),
+            500,
+        )
+
+
+@app.route("/api/detect/raw", methods=["POST"])
+def detect_drowsiness_raw():
+    """
+    Detection endpoint for raw image bytes - no base64 / JSON overhead
+
+    Body: raw image bytes (Content-Type: image/jpeg, image/png or
+    application/octet-stream)
 
-        # Validate confidence threshold
-        if confidence_threshold < 0.0 or confidence_threshold > 1.0:
+    Query parameters:
+    - model: yolo | auto (optional, default: yolo)
+    - sessionId: optional_session_id (optional)
+    - confidence_threshold: 0.5 (optional)
+    """
+    try:
+        # Refuse before reading the body when the client announces its size
+        if (request.content_length or 0) > MAX_IMAGE_BYTES:
+            return _image_too_large_response()
+
+        image_bytes = request.get_data(cache=False)
+        if len(image_bytes) > MAX_IMAGE_BYTES:
+            return _image_too_large_response()
+        if not image_bytes:
             return (
                 jsonify(
                     response_formatter.format_error_response(
-                        "confidence_threshold must be between 0.0 and 1.0"
+                        "No image bytes provided in request body"
                     )
                 ),
                 400,
             )
 
-        # Run inference using the unified method
-        start_time = datetime.utcnow()
+        model_name = request.args.get("model", "yolo")
+        session_id = request.args.get("sessionId")
+        confidence_threshold = float(request.args.get("confidence_threshold", 0.5))
 
         try:
-            result = model_loader.detect_drowsiness(pil_image, model_name)
-            inference_time = (datetime.utcnow() - start_time).total_seconds()
-
-            # Apply confidence threshold
-            if result.get("confidence", 0) < confidence_threshold:
-                result["is_drowsy"] = "unknown"
-                result["class_name"] = "unknown"
-                logger.info(
-                    f"Result filtered by confidence threshold: {result.get('confidence', 0)} < {confidence_threshold}"
-                )
-
-            # Add session and timing info
-            result["sessionId"] = session_id
-            result["inference_time_seconds"] = round(inference_time, 3)
-            result["confidence_threshold"] = confidence_threshold
-
-            # Create alert level based on normalized class name
-            cls_norm = _normalize_class_name(result["class_name"])
-            cls_human = _humanize_class_name(result["class_name"])
-
-            # Check category from is_drowsy field (now returns 4-class string)
-            category = result["is_drowsy"]
-
-            if category == "drowsy":
-                if cls_norm in ["sleepy-driving", "yawning", "sleepy", "yawn"]:
-                    alert_level = "high"
-                    alert_message = (
-                        f"Driver is {cls_human}! Immediate attention required."
-                    )
-                else:
-                    alert_level = "high"
-                    alert_message = f"Drowsiness detected: {cls_human}! Immediate attention required."
-            elif category == "distracted":
-                alert_level = "medium"
-                alert_message = (
-                    f"Driver distracted: {cls_human} detected. Stay focused."
-                )
-            elif category == "safety-violation":
-                alert_level = "critical"
-                alert_message = (
-                    f"Safety violation: {cls_human} detected! Pull over immediately."
-                )
-            else:  # safe
-                alert_level = "none"
-                alert_message = f"Driver appears {cls_human}. Continue monitoring."
-
-            result["alert_level"] = alert_level
-            result["alert_message"] = alert_message
-
-            # Save annotated image to outputs/detections
-            try:
-                detections_dir = os.getenv(
-                    "DETECTIONS_DIR", os.path.join("outputs", "detections")
-                )
-                os.makedirs(detections_dir, exist_ok=True)
-
-                filename = (
-                    f"{model_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.jpg"
-                )
-                save_path = os.path.join(detections_dir, filename)
-                logger.info(f"📸 Attempting to save annotated image to: {save_path}")
-
-                if model_name == "yolo":
-                    yolo_model = model_loader.get_model("yolo")
-                    img_array = np.array(pil_image)
-                    logger.info(f"🖼️ Running YOLO inference for annotation...")
-                    yolo_results = yolo_model.model(img_array, verbose=False)
-                    
-                    logger.info(f"📊 YOLO results: {yolo_results is not None}, len: {len(yolo_results) if yolo_results else 0}")
-                    
-                    if yolo_results and len(yolo_results) > 0:
-                        # plot() returns BGR by default, but we want RGB for correct colors
-                        # Use PIL parameter to get RGB directly
-                        logger.info(f"🎨 Plotting YOLO results...")
-                        annotated = yolo_results[0].plot(pil=True)  # Returns PIL Image in RGB
-                        # Save PIL Image directly (no need for cv2)
-                        annotated.save(save_path, quality=95)
-                        result["saved_image_path"] = save_path
-                        logger.info(f"✅ Saved YOLO annotated image to {save_path}")
-                    else:
-                        # Fallback: draw bbox if available
-                        logger.info(f"⚠️ No YOLO results, trying fallback bbox drawing...")
-                        if result.get("bbox"):
-                            x = int(result["bbox"].get("x", 0))
-                            y = int(result["bbox"].get("y", 0))
-                            w = int(result["bbox"].get("width", 0))
-                            h = int(result["bbox"].get("height", 0))
-                            img_bgr = cv2.cvtColor(
-                                np.array(pil_image), cv2.COLOR_RGB2BGR
-                            )
-                            cv2.rectangle(
-                                img_bgr, (x, y), (x + w, y + h), (0, 255, 0), 2
-                            )
-                            ok = cv2.imwrite(save_path, img_bgr)
-                            if ok:
-                                result["saved_image_path"] = save_path
-                                logger.info(f"✅ Saved bbox image to {save_path}")
-                            else:
-                                logger.error(f"❌ Failed to write bbox image to {save_path}")
-                        else:
-                            logger.warning(f"⚠️ No bbox available, cannot save annotated image")
-                else:
-                    # Future models: simple bbox draw if bbox exists
-                    logger.info(f"🔧 Using fallback for model: {model_name}")
-                    if result.get("bbox"):
-                        x = int(result["bbox"].get("x", 0))
-                        y = int(result["bbox"].get("y", 0))
-                        w = int(result["bbox"].get("width", 0))
-                        h = int(result["bbox"].get("height", 0))
-                        img_bgr = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                        cv2.rectangle(img_bgr, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                        ok = cv2.imwrite(save_path, img_bgr)
-                        if ok:
-                            result["saved_image_path"] = save_path
-                            logger.info(f"✅ Saved bbox image to {save_path}")
-                        else:
-                            logger.error(f"❌ Failed to write image to {save_path}")
-                    else:
-                        logger.warning(f"⚠️ No bbox available for model {model_name}")
-            except Exception as save_err:
-                logger.error(f"❌ Failed to save annotated image: {save_err}", exc_info=True)
-
+            image_format, width, height = image_processor.sniff_image(image_bytes)
             logger.info(
-                f"Detection completed: {result.get('class_name', 'unknown')} (confidence: {result.get('confidence', 0):.2f})"
+                "Received raw image: %s, format: %s", (width, height), image_format
             )
-
-            return jsonify(response_formatter.format_detection_response(result))
-
         except Exception as e:
-            logger.error(f"Detection error: {str(e)}")
             return (
                 jsonify(
                     response_formatter.format_error_response(
-                        f"Detection failed: {str(e)}"
+                        f"Invalid image data: {str(e)}"
                     )
                 ),
-                500,
+                400,
             )
 
+        return _detect_single(image_bytes, model_name, session_id, confidence_threshold)
+
     except Exception as e:
-        logger.error(f"Error in detection: {e}")
+        logger.error("Error in raw detection: %s", e)
         return (
             jsonify(response_formatter.format_error_response("Internal server error")),
             500,
         )
 
 
+def _decode_batch_image(image_data):
+    """Decode one base64 batch entry to a fully loaded PIL image"""
+    if len(image_data) > MAX_B64_BYTES:
+        raise ValueError(f"Image too large (max {MAX_IMAGE_BYTES} bytes)")
+    decoded_data = image_processor.decode_base64(image_data)
+    if len(decoded_data) > MAX_IMAGE_BYTES:
+        raise ValueError(f"Image too large (max {MAX_IMAGE_BYTES} bytes)")
+    pil_image = image_processor.open_image(decoded_data, DRAFT_SIZE)
+    # Force the pixel decode here so a corrupt image fails on its own
+    pil_image.load()
+    return pil_image
+
+
 @app.route("/api/detect/batch", methods=["POST"])
 def detect_batch():
     """
@@ -411,13 +688,13 @@ def detect_batch():
     Expected JSON:
     {
         "images": ["base64_1", "base64_2", ...],
-        "model": "yolo" (optional),
+        "model": "yolo" | "auto" (optional),
         "sessionId": "optional_session_id",
         "save": true  // optional, default true; save annotated images
     }
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True, cache=False)
 
         if not data or "images" not in data:
             return (
@@ -443,7 +720,7 @@ def detect_batch():
             )
 
         # Validate model
-        if model_loader.get_model(model_name) is None:
+        if model_name != "auto" and model_loader.get_model(model_name) is None:
             return (
                 jsonify(
                     response_formatter.format_error_response(
@@ -453,59 +730,72 @@ def detect_batch():
                 400,
             )
 
-        # Process each image
-        results = []
-        start_time = datetime.utcnow()
+        # Decode every image first (in parallel) so inference can run as one batch
+        results = {}
+        pil_images = {}
+        start_time = perf_counter()
 
-        for i, image_data in enumerate(images_data):
+        futures = [decode_pool.submit(_decode_batch_image, d) for d in images_data]
+        for i, future in enumerate(futures):
             try:
-                # Simple validation
-                if "," in image_data:
-                    image_data = image_data.split(",")[1]
-
-                decoded_data = base64.b64decode(image_data)
-                pil_image = Image.open(io.BytesIO(decoded_data))
-
-                # Run inference via unified loader
-                detection = model_loader.detect_drowsiness(pil_image, model_name)
-                detection["sessionId"] = session_id
-
-                # Optionally save annotated image (YOLO)
-                if save_images and model_name == "yolo":
-                    try:
-                        detections_dir = os.getenv(
-                            "DETECTIONS_DIR", os.path.join("outputs", "detections")
-                        )
-                        os.makedirs(detections_dir, exist_ok=True)
-                        filename = f"{model_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}_{i}.jpg"
-                        save_path = os.path.join(detections_dir, filename)
-
-                        yolo_model = model_loader.get_model("yolo")
-                        img_array = np.array(pil_image)
-                        yolo_results = yolo_model.model(img_array, verbose=False)
-                        if yolo_results and len(yolo_results) > 0:
-                            # Use pil=True to get RGB PIL Image instead of BGR numpy array
-                            annotated = yolo_results[0].plot(pil=True)
-                            annotated.save(save_path, quality=95)
-                            detection["saved_image_path"] = save_path
-                    except Exception as save_err:
-                        logger.warning(
-                            f"Failed to save annotated batch image {i}: {save_err}"
-                        )
-                # Format individual result
-                result = response_formatter.format_detection_response(detection)
-                result["index"] = i
-                results.append(result)
-
+                pil_images[i] = future.result()
             except Exception as e:
-                logger.error(f"Error processing image {i}: {e}")
+                logger.error("Error processing image %s: %s", i, e)
+                error_result = response_formatter.format_error_response(
+                    f"Error processing image {i}: {str(e)}"
+                )
+                error_result["index"] = i
+                results[i] = error_result
+        # Decoded - drop the base64 payloads (up to 10 images) before inference
+        del data, images_data, futures
+
+        # Run inference via unified loader - one forward pass for the whole batch
+        try:
+            detections = model_loader.detect_batch(
+                list(pil_images.values()), model_name
+            )
+        except Exception as e:
+            logger.error("Error in batch inference: %s", e)
+            detections = None
+            for i in pil_images:
                 error_result = response_formatter.format_error_response(
                     f"Error processing image {i}: {str(e)}"
                 )
                 error_result["index"] = i
-                results.append(error_result)
+                results[i] = error_result
+
+        annotate = save_images and bool(detections)
+        # One stamp for the batch; the image index keeps names unique
+        batch_stamp = time_ns()
+
+        for i, detection in zip(pil_images, detections or []):
+            detection["sessionId"] = session_id
+            _restore_bbox_scale(detection, pil_images[i])
+            raw_result = detection.pop("raw_result", None)
+
+            # Optionally save annotated image (YOLO) from the batch's own Results
+            if annotate and raw_result is not None:
+                try:
+                    filename = f"{model_name}_{batch_stamp}_{i}.jpg"
+                    save_path = os.path.join(DETECTIONS_DIR, filename)
+
+                    # Bind raw_result per image - the lambda runs later
+                    if image_writer.submit(
+                        save_path, lambda r=raw_result: _draw_detections(r)
+                    ):
+                        detection["saved_image_path"] = save_path
+                except Exception as save_err:
+                    logger.warning(
+                        "Failed to save annotated batch image %s: %s", i, save_err
+                    )
+            # Format individual result
+            result = response_formatter.format_detection_response(detection)
+            result["index"] = i
+            results[i] = result
 
-        total_time = (datetime.utcnow() - start_time).total_seconds()
+        results = [results[i] for i in sorted(results)]
+
+        total_time = perf_counter() - start_time
 
         # Format batch response
         response = response_formatter.format_batch_response(
@@ -516,13 +806,13 @@ def detect_batch():
         )
 
         logger.info(
-            f"Batch processing completed: {len(results)} images in {total_time:.2f}s"
+            "Batch processing completed: %s images in %.2fs", len(results), total_time
         )
 
         return jsonify(response)
 
     except Exception as e:
-        logger.error(f"Error in batch detection: {e}")
+        logger.error("Error in batch detection: %s", e)
         return (
             jsonify(response_formatter.format_error_response("Internal server error")),
             500,
@@ -550,11 +840,11 @@ def start_session():
             },
         )
 
-        logger.info(f"Session started: {session_id}")
+        logger.info("Session started: %s", session_id)
         return jsonify(response)
 
     except Exception as e:
-        logger.error(f"Error starting session: {e}")
+        logger.error("Error starting session: %s", e)
         return (
             jsonify(
                 response_formatter.format_error_response("Failed to start session")
@@ -593,54 +883,65 @@ def end_session():
             },
         )
 
-        logger.info(f"Session ended: {session_id}")
+        logger.info("Session ended: %s", session_id)
         return jsonify(response)
 
     except Exception as e:
-        logger.error(f"Error ending session: {e}")
+        logger.error("Error ending session: %s", e)
         return (
             jsonify(response_formatter.format_error_response("Failed to end session")),
             500,
         )
 
 
+@lru_cache(maxsize=1)
+def _mock_session_history(start):
+    """
+    Mock session history: one hourly session per slot, counting back from
+    `start` (a whole minute; timedelta also handles midnight).
+    Returns (sessions, total drowsy frames).
+    """
+    start_ts = int(start.timestamp())
+    mock_sessions = [
+        {
+            "id": f"session_{start_ts - i * 3600}",
+            "startTime": (start - timedelta(hours=i)).isoformat(),
+            "endTime": (start - timedelta(hours=i - 1)).isoformat(),
+            "duration": 3600,
+            "totalFrames": 100 + i * 20,
+            "drowsyFrames": 5 + i * 2,
+            "alertsTriggered": i,
+            "averageConfidence": 0.75 + (i * 0.05),
+            "modelUsed": "yolo",
+            "isActive": False,
+        }
+        for i in range(5)
+    ]
+    return mock_sessions, sum(s["drowsyFrames"] for s in mock_sessions)
+
+
 @app.route("/api/session/history", methods=["GET"])
 def get_session_history():
     """Get session history"""
     try:
-        # Mock session history
-        mock_sessions = [
-            {
-                "id": f"session_{int(datetime.utcnow().timestamp()) - i * 3600}",
-                "startTime": datetime.utcnow()
-                .replace(hour=datetime.utcnow().hour - i)
-                .isoformat(),
-                "endTime": datetime.utcnow()
-                .replace(hour=datetime.utcnow().hour - i + 1)
-                .isoformat(),
-                "duration": 3600,
-                "totalFrames": 100 + i * 20,
-                "drowsyFrames": 5 + i * 2,
-                "alertsTriggered": i,
-                "averageConfidence": 0.75 + (i * 0.05),
-                "modelUsed": "yolo",
-                "isActive": False,
-            }
-            for i in range(5)
-        ]
+        now = datetime.utcnow()
+        # Polled by clients - the mock list only changes once a minute
+        mock_sessions, total_drowsy = _mock_session_history(
+            now.replace(second=0, microsecond=0)
+        )
 
         response = {
             "status": "success",
             "sessions": mock_sessions,
             "totalSessions": len(mock_sessions),
-            "totalDrowsyDetections": sum(s["drowsyFrames"] for s in mock_sessions),
-            "timestamp": datetime.utcnow().isoformat(),
+            "totalDrowsyDetections": total_drowsy,
+            "timestamp": now.isoformat(),
         }
 
         return jsonify(response)
 
     except Exception as e:
-        logger.error(f"Error getting session history: {e}")
+        logger.error("Error getting session history: %s", e)
         return (
             jsonify(
                 response_formatter.format_error_response(
@@ -661,6 +962,33 @@ def not_found(error):
     )
 
 
+@app.before_request
+def reject_oversized_body():
+    # Routes catch every exception from get_json()/form parsing as a 500, so
+    # refuse a declared oversized body here, before anything reads it
+    if (request.content_length or 0) > app.config["MAX_CONTENT_LENGTH"]:
+        return payload_too_large(None)
+    # A chunked upload declares no length: read (and cache) it here instead.
+    # Form parsing raises 413 itself (handled below); any other body is cut
+    # off at MAX_CONTENT_LENGTH, so one that fills the limit is too large
+    if request.content_length is None and request.method in ("POST", "PUT"):
+        body = request.get_data(parse_form_data=True)
+        if len(body) >= app.config["MAX_CONTENT_LENGTH"]:
+            return payload_too_large(None)
+
+
+@app.errorhandler(413)
+def payload_too_large(error):
+    return (
+        jsonify(
+            response_formatter.format_error_response(
+                "Request body too large", "PAYLOAD_TOO_LARGE"
+            )
+        ),
+        413,
+    )
+
+
 @app.errorhandler(500)
 def internal_error(error):
     return (
@@ -682,10 +1010,14 @@ if __name__ == "__main__":
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 
     logger.info("🚀 Starting Drowsiness Detection API (Real YOLO Mode)")
-    logger.info(f"📍 Server: http://{HOST}:{PORT}")
-    logger.info(f"🔧 Debug mode: {DEBUG}")
+    logger.info("📍 Server: http://%s:%s", HOST, PORT)
+    logger.info("🔧 Debug mode: %s", DEBUG)
 
-    logger.info(f"🤖 Models loaded: {len(model_loader.models)}")
-    logger.info(f"📋 Available models: {list(model_loader.models.keys())}")
+    logger.info("🤖 Models loaded: %s", len(model_loader.models))
+    logger.info("📋 Available models: %s", list(model_loader.models.keys()))
 
-    app.run(host=HOST, port=PORT, debug=DEBUG)
+    # Development server only - use gunicorn.conf.py in production.
+    # The debug reloader re-imports this module in a child process, which
+    # would load (and warm up) every model twice - keep it opt-in.
+    RELOAD = os.getenv("API_RELOAD", "False").lower() == "true"
+    app.run(host=HOST, port=PORT, debug=DEBUG, threaded=True, use_reloader=RELOAD)
@@ -0,0 +1,16 @@
+# ASGI entrypoint for the Drowsiness Detection API
+# Serves the Flask app on an asyncio event loop (uvloop + httptools):
+#   uvicorn backend.asgi:app --loop uvloop --http httptools --port 8000
+#
+# Connections are multiplexed on the event loop; each request is handed to
+# the Flask app on a pool of ASGI_THREADS worker threads (default 8, like
+# gunicorn.conf.py), so slow requests don't queue behind each other and
+# concurrent /api/detect calls are coalesced into batched forward passes by
+# the inference queue.
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from .app import app as flask_app
+
+app = WSGIMiddleware(flask_app, workers=int(os.getenv("ASGI_THREADS", 8)))
@@ -0,0 +1,40 @@
+# Gunicorn configuration for the Drowsiness Detection API
+# Usage (from repo root with PYTHONPATH=src):
+#   gunicorn -c src/backend/gunicorn.conf.py backend.app:app
+
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+
+# One process so the models are loaded (and held in GPU memory) once;
+# threads overlap request I/O with inference, which releases the GIL
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+
+def _cuda_available() -> bool:
+    # NVML-based check so the master never initializes a CUDA context
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    try:
+        import torch
+
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+# CPU: load models in the master before forking; workers share the weight
+# pages copy-on-write. GPU: a CUDA context can't survive fork, so the worker
+# loads the models itself and its threads share that single GPU copy.
+USE_CUDA = _cuda_available()
+preload_app = not USE_CUDA
+
+if USE_CUDA and workers > 1:
+    print(
+        f"⚠️ {workers} gunicorn workers will each hold a copy of the models in "
+        "GPU memory - prefer GUNICORN_WORKERS=1 with more GUNICORN_THREADS"
+    )
+
+# On GPU hosts the worker's boot includes model load, warm-up and engine build
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
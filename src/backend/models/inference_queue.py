@@ -0,0 +1,126 @@
+# Inference Queue
+# Single inference thread that coalesces concurrent requests into batches
+
+import logging
+import queue
+import threading
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _InferenceRequest:
+    """One pending image waiting for the inference thread"""
+
+    __slots__ = ("image", "model_name", "done", "result", "error")
+
+    def __init__(self, image: Any, model_name: str):
+        self.image = image
+        self.model_name = model_name
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[Exception] = None
+
+
+class InferenceQueue:
+    """
+    Hands images from request threads to a single inference thread.
+
+    Request threads and the inference thread live in the same process, so
+    images are passed by reference (no pickling / copies). The inference
+    thread drains whatever arrived within `max_wait_ms` (up to `max_batch`)
+    and runs it through `model_loader.detect_batch` as one forward pass.
+    """
+
+    def __init__(self, model_loader, max_batch: int = 8, max_wait_ms: float = 5.0):
+        self.model_loader = model_loader
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_InferenceRequest]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def detect_drowsiness(self, image: Any, model_name: str = "yolo") -> Dict:
+        """Blocking call with the same contract as model_loader.detect_drowsiness"""
+        self._ensure_started()
+
+        request = _InferenceRequest(image, model_name)
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="inference-queue", daemon=True
+                )
+                self._thread.start()
+
+    def _collect_batch(self) -> List[_InferenceRequest]:
+        batch = [self._queue.get()]
+        deadline = perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            # Requests may target different models - one forward pass per model
+            by_model: Dict[str, List[_InferenceRequest]] = {}
+            for request in batch:
+                by_model.setdefault(request.model_name, []).append(request)
+
+            for model_name, requests in by_model.items():
+                try:
+                    self._detect(requests, model_name)
+                except Exception as e:
+                    if len(requests) == 1:
+                        logger.error("Inference failed for %s: %s", model_name, e)
+                        requests[0].error = e
+                    else:
+                        # One bad image must not fail the whole batch - retry
+                        # each request on its own so only the culprit errors
+                        logger.warning(
+                            "Batched inference failed for %s, retrying %s images "
+                            "one at a time: %s",
+                            model_name,
+                            len(requests),
+                            e,
+                        )
+                        for request in requests:
+                            try:
+                                self._detect([request], model_name)
+                            except Exception as single_error:
+                                logger.error(
+                                    "Inference failed for %s: %s",
+                                    model_name,
+                                    single_error,
+                                )
+                                request.error = single_error
+                finally:
+                    for request in requests:
+                        request.done.set()
+
+    def _detect(self, requests: List[_InferenceRequest], model_name: str):
+        results = self.model_loader.detect_batch(
+            [r.image for r in requests], model_name
+        )
+        for request, result in zip(requests, results):
+            request.result = result
@@ -2,13 +2,15 @@
 # Loads and runs inference with trained YOLO and Faster R-CNN models
 
 import torch
-import torchvision.transforms as T
+import torchvision.transforms.v2.functional as F
 import numpy as np
 from PIL import Image
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 import logging
 import os
+import threading
+import time
 from pathlib import Path
 import cv2
 
@@ -24,31 +26,85 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Models take decoded frames either as PIL images or RGB uint8 arrays (HxWx3)
+ImageInput = Union[Image.Image, np.ndarray]
+
+# Let cuDNN autotune conv algorithms; the warm-up pass pays the search cost
+if torch.cuda.is_available():
+    torch.backends.cudnn.benchmark = True
+
+# Allow TF32 tensor-core kernels for FP32 matmul/conv (Ampere+)
+torch.set_float32_matmul_precision("high")
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+
+# FP16 inference on CUDA (set MODEL_HALF=False to force FP32)
+USE_HALF = (
+    torch.cuda.is_available() and os.getenv("MODEL_HALF", "True").lower() == "true"
+)
+
+# Serve YOLO from a cached TensorRT engine (opt-in, requires the tensorrt package)
+USE_TENSORRT = (
+    torch.cuda.is_available()
+    and os.getenv("MODEL_TENSORRT", "False").lower() == "true"
+)
+TENSORRT_MAX_BATCH = 10  # Matches the /api/detect/batch limit
+
+# Frame sizes (H, W) used for YOLO warm-up: square, 4:3 and 16:9 webcam frames
+WARMUP_FRAME_SIZES = ((640, 640), (480, 640), (720, 1280))
+
+# CPU hosts: serve YOLO through ONNX Runtime from a cached .onnx export (opt-in,
+# requires the onnx / onnxruntime packages)
+USE_ONNX = (
+    not torch.cuda.is_available() and os.getenv("MODEL_ONNX", "False").lower() == "true"
+)
+
+# INT8 engine calibrated on a YOLO data.yaml (e.g. the training dataset).
+# Calibration runs once at export; the calibrated engine is cached on disk.
+INT8_CALIBRATION_DATA = os.getenv("MODEL_INT8_DATA")
+USE_INT8 = USE_TENSORRT and bool(INT8_CALIBRATION_DATA)
+
+# Forward passes allowed to run at once across request / queue threads, over
+# all models. Each model instance additionally holds its own lock (model.lock),
+# so MODEL_INFLIGHT > 1 only lets *different* models (e.g. YOLO and Faster
+# R-CNN) run side by side - one instance is never entered twice concurrently.
+# Concurrent passes on one GPU only contend for the context and fragment VRAM;
+# batching (InferenceQueue, /api/detect/batch) is the way to use it fully.
+INFERENCE_SLOTS = threading.BoundedSemaphore(int(os.getenv("MODEL_INFLIGHT", 1)))
+
 
 # Helper utilities for class handling (name-based, model-agnostic)
+# Lower-cased class name -> category, built once (called for every frame)
+DROWSY_CLASS_KEYWORDS = frozenset({"drowsy"})
+DISTRACTED_CLASS_KEYWORDS = frozenset(
+    {"distracted", "drinking", "eating", "phoneuse", "smoking"}
+)
+# YOLO classes that never make a frame "interesting" on their own
+SAFE_CLASS_KEYWORDS = frozenset(
+    {"safe-driving", "safe_driving", "safedriving", "seatbelt"}
+)
+CLASS_STATUS = {
+    **{n: "safe" for n in SAFE_CLASS_KEYWORDS},
+    **{n: "distracted" for n in DISTRACTED_CLASS_KEYWORDS},
+    **{n: "drowsy" for n in DROWSY_CLASS_KEYWORDS},
+}
+
+
 def map_class_name_to_status(name: str) -> str:
     if not name:
         return "unknown"
-    
-    n = name.lower()
-    drowsy_keywords = ["drowsy"]
-    distracted_keywords = [
-        "distracted",
-        "drinking",
-        "eating",
-        "phoneuse",
-        "smoking",
-    ]
-    safe_keywords = ["safe-driving", "safe_driving", "safedriving", "seatbelt"]
-
-    if n in drowsy_keywords:
-        return "drowsy"
-    if n in distracted_keywords:
-        return "distracted"
-    if n in safe_keywords:
-        return "safe"
     # นอกเหนือจากนี้ถือเป็น unknown คือไม่รู้
-    return "unknown"
+    return CLASS_STATUS.get(name.lower(), "unknown")
+
+
+def _is_mapped_detection(result: Dict) -> bool:
+    """True for an actual detection (not the no-detection fallback, which has
+    no bbox) whose class name maps to a known status"""
+    return (
+        result.get("bbox") is not None
+        and map_class_name_to_status(result.get("class_name")) != "unknown"
+    )
+
 
 class RealFasterRCNNModel:
     """Real Faster R-CNN model for drowsiness detection with 7-class classification"""
@@ -61,15 +117,17 @@ class RealFasterRCNNModel:
         self.is_loaded = False
         self.accuracy = 0.91  # Based on your training results
         self.inference_speed = "medium"
+        # One forward pass at a time on this instance (see INFERENCE_SLOTS)
+        self.lock = threading.Lock()
 
-        # Image preprocessing transforms to match training
-        self.transform = T.Compose(
-            [
-                T.ToTensor(),
-                # Note: Faster R-CNN typically doesn't need normalization
-                # as it's handled internally, but you can add if needed:
-                # T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-            ]
+        # Image preprocessing (see preprocess_image) matches training: resize to
+        # 800x800 and scale to [0, 1]. Faster R-CNN normalizes internally.
+
+        # Side stream for host->device copies (double-buffered with compute)
+        self._copy_stream = (
+            torch.cuda.Stream(device=self.device)
+            if self.device.type == "cuda"
+            else None
         )
 
         self.load_model()
@@ -78,119 +136,203 @@ class RealFasterRCNNModel:
         """Load the TorchScript model"""
         try:
             if not os.path.exists(self.model_path):
-                logger.error(f"Model file not found: {self.model_path}")
+                logger.error("Model file not found: %s", self.model_path)
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
 
-            logger.info(f"Loading Faster R-CNN model from {self.model_path}")
+            logger.info("Loading Faster R-CNN model from %s", self.model_path)
             self.model = torch.jit.load(self.model_path, map_location=self.device)
             self.model.eval()
             self.is_loaded = True
-            logger.info(f"Model loaded successfully on {self.device}")
+            logger.info("Model loaded successfully on %s", self.device)
 
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             self.is_loaded = False
             raise
 
-    def preprocess_image(self, pil_image: Image.Image) -> torch.Tensor:
+    def warmup(self, runs: int = 1):
+        """Run dummy forward passes so CUDA init and cuDNN autotune happen now"""
+        if not self.is_loaded:
+            return
+
+        dummy = torch.zeros(3, 800, 800, device=self.device)
+        with torch.inference_mode(), self._autocast():
+            for _ in range(runs):
+                self.model([dummy])
+
+    def _autocast(self):
+        """FP16 autocast context on CUDA, no-op otherwise"""
+        return torch.autocast(
+            device_type=self.device.type, dtype=torch.float16, enabled=USE_HALF
+        )
+
+    def preprocess_image(self, pil_image: ImageInput) -> torch.Tensor:
         """
         Preprocess PIL image for model inference
         Resize to match training size (800x800 as per your notebook)
         """
+        return self._resize_on_device(*self._upload(pil_image))
+
+    def _upload(
+        self, pil_image: ImageInput
+    ) -> Tuple[torch.Tensor, Optional["torch.cuda.Event"]]:
+        """
+        Start copying the raw uint8 pixels (4x smaller than float32) to the
+        model device. On CUDA the copy is issued from pinned memory on a side
+        stream, so it overlaps with work already queued on the compute stream.
+        Returns the device tensor and an event marking when the copy is done.
+        """
+        try:
+            if isinstance(pil_image, Image.Image):
+                # Convert to RGB if needed
+                if pil_image.mode != "RGB":
+                    pil_image = pil_image.convert("RGB")
+                # torch.from_numpy needs a writable buffer, np.asarray of a
+                # PIL image is read-only
+                pil_image = np.array(pil_image)
+
+            host_tensor = torch.from_numpy(pil_image).permute(2, 0, 1)
+            if self._copy_stream is None:
+                return host_tensor.to(self.device), None
+
+            host_tensor = host_tensor.pin_memory()
+            with torch.cuda.stream(self._copy_stream):
+                tensor_image = host_tensor.to(self.device, non_blocking=True)
+                ready = torch.cuda.Event()
+                ready.record(self._copy_stream)
+            return tensor_image, ready
+
+        except Exception as e:
+            logger.error("Error uploading image: %s", e)
+            raise
+
+    def _resize_on_device(
+        self, tensor_image: torch.Tensor, ready: Optional["torch.cuda.Event"] = None
+    ) -> torch.Tensor:
+        """Resize / scale an uploaded image on the model device"""
         try:
-            # Convert to RGB if needed
-            if pil_image.mode != "RGB":
-                pil_image = pil_image.convert("RGB")
+            if ready is not None:
+                # Compute stream waits for this image's copy only
+                compute_stream = torch.cuda.current_stream(self.device)
+                compute_stream.wait_event(ready)
+                tensor_image.record_stream(compute_stream)
+
+            original_size = tuple(tensor_image.shape[1:])
+            target_size = (800, 800)  # As per your notebook
 
             # Resize to match training size
             # Faster R-CNN can handle different sizes, but consistency helps
-            original_size = pil_image.size
-            target_size = (800, 800)  # As per your notebook
-            pil_image = pil_image.resize(target_size, Image.Resampling.BILINEAR)
+            tensor_image = F.resize(tensor_image, list(target_size), antialias=True)
 
-            # Apply transforms
-            tensor_image = self.transform(pil_image)
+            # Equivalent of ToTensor(): uint8 [0, 255] -> float32 [0, 1]
+            tensor_image = F.to_dtype(tensor_image, torch.float32, scale=True)
 
             logger.debug(
-                f"Image preprocessed: {original_size} -> {target_size}, tensor shape: {tensor_image.shape}"
+                "Image preprocessed: %s -> %s, tensor shape: %s",
+                original_size,
+                target_size,
+                tensor_image.shape,
             )
             return tensor_image
 
         except Exception as e:
-            logger.error(f"Error preprocessing image: {e}")
+            logger.error("Error preprocessing image: %s", e)
             raise
 
     def predict(
-        self, pil_image: Image.Image, confidence_threshold: float = 0.7
+        self, pil_image: ImageInput, confidence_threshold: float = 0.7
     ) -> Tuple[bool, float, Optional[Dict], str, int]:
         """
         Run inference on the image
         Returns: (is_drowsy, confidence, bbox, class_name, class_id)
         """
+        return self.predict_batch([pil_image], confidence_threshold)[0]
+
+    def predict_batch(
+        self, pil_images: List[ImageInput], confidence_threshold: float = 0.7
+    ) -> List[Tuple[bool, float, Optional[Dict], str, int]]:
+        """
+        Run inference on several images with a single forward pass
+        Returns: list of (is_drowsy, confidence, bbox, class_name, class_id)
+        """
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
 
         try:
-            # Preprocess image
-            tensor_image = self.preprocess_image(pil_image)
-            tensor_image = tensor_image.to(self.device)
+            # Queue every upload first: image k+1 is copied host->device while
+            # image k is resized on the compute stream
+            uploads = [self._upload(pil_image) for pil_image in pil_images]
+            tensor_images = [
+                self._resize_on_device(tensor_image, ready)
+                for tensor_image, ready in uploads
+            ]
 
             # Run inference
-            with torch.no_grad():
+            with torch.inference_mode(), self._autocast():
                 # Faster R-CNN expects a list of tensors
-                predictions = self.model([tensor_image])
-
-            prediction = predictions[0]  # Get first (and only) prediction
-
-            # Extract results
-            boxes = prediction["boxes"].cpu()
-            scores = prediction["scores"].cpu()
-            labels = prediction["labels"].cpu()
-
-            # Filter by confidence threshold
-            keep = scores >= confidence_threshold
-
-            if keep.sum() == 0:
-                # No confident detections - return safe default
-                logger.info("No confident detections found")
-                return False, 0.0, None, "safe-driving", 4
-
-            # Get the highest confidence detection
-            best_idx = scores[keep].argmax()
-            final_keep = keep.nonzero(as_tuple=True)[0][best_idx]
-
-            best_box = boxes[final_keep]
-            best_score = scores[final_keep]
-            best_label = labels[final_keep]
-
-            # Convert to class info (labels are dataset-dependent)
-            class_id = int(best_label.item())
-            # Without a dynamic mapping for Faster R-CNN, use label id as-is
-            # and a generic name string
-            class_name = str(class_id)
-            confidence = float(best_score.item())
-
-            # Determine if drowsy by name (unknown mapping → assume non-drowsy)
-            answer = map_class_name_to_status(class_name)
-
-            # Convert bbox to format expected by API
-            x1, y1, x2, y2 = best_box.tolist()
-            bbox = {
-                "x": int(x1),
-                "y": int(y1),
-                "width": int(x2 - x1),
-                "height": int(y2 - y1),
-            }
+                predictions = self.model(tensor_images)
 
-            logger.info(
-                f"Prediction: {class_name} (confidence: {confidence:.3f}, drowsy: {answer})"
-            )
-            return answer, confidence, bbox, class_name, class_id
+            return [
+                self._parse_prediction(prediction, confidence_threshold)
+                for prediction in predictions
+            ]
 
         except Exception as e:
-            logger.error(f"Error during inference: {e}")
+            logger.error("Error during inference: %s", e)
             raise
 
+    def _parse_prediction(
+        self, prediction: Dict[str, torch.Tensor], confidence_threshold: float
+    ) -> Tuple[bool, float, Optional[Dict], str, int]:
+        """Convert one Faster R-CNN output dict into the prediction tuple"""
+        # Extract results
+        boxes = prediction["boxes"].cpu()
+        scores = prediction["scores"].cpu()
+        labels = prediction["labels"].cpu()
+
+        # Filter by confidence threshold
+        keep = scores >= confidence_threshold
+
+        if keep.sum() == 0:
+            # No confident detections - return safe default
+            logger.info("No confident detections found")
+            return False, 0.0, None, "safe-driving", 4
+
+        # Get the highest confidence detection
+        best_idx = scores[keep].argmax()
+        final_keep = keep.nonzero(as_tuple=True)[0][best_idx]
+
+        best_box = boxes[final_keep]
+        best_score = scores[final_keep]
+        best_label = labels[final_keep]
+
+        # Convert to class info (labels are dataset-dependent)
+        class_id = int(best_label.item())
+        # Without a dynamic mapping for Faster R-CNN, use label id as-is
+        # and a generic name string
+        class_name = str(class_id)
+        confidence = float(best_score.item())
+
+        # Determine if drowsy by name (unknown mapping → assume non-drowsy)
+        answer = map_class_name_to_status(class_name)
+
+        # Convert bbox to format expected by API
+        x1, y1, x2, y2 = best_box.tolist()
+        bbox = {
+            "x": int(x1),
+            "y": int(y1),
+            "width": int(x2 - x1),
+            "height": int(y2 - y1),
+        }
+
+        logger.info(
+            "Prediction: %s (confidence: %.3f, drowsy: %s)",
+            class_name,
+            confidence,
+            answer,
+        )
+        return answer, confidence, bbox, class_name, class_id
+
 
 class RealYOLOModel:
     """Real YOLO model for drowsiness detection"""
@@ -209,10 +351,17 @@ class RealYOLOModel:
 
         self.model_path = model_path or "yolo.pt"
         self.model = None
+        # Most frames per forward pass (None: unlimited; TensorRT engines are
+        # built for a fixed maximum batch)
+        self.max_batch: Optional[int] = None
+        # The Ultralytics predictor keeps per-call state and is not
+        # thread-safe - one forward pass at a time on this instance
+        self.lock = threading.Lock()
         self.is_loaded = False
         self.name = "Real YOLO v8"
         self.accuracy = 0.92
         self.inference_speed = 0.05
+        self._safe_ids: Optional[frozenset] = None
         print(f"🎯 RealYOLOModel initialized with model path: {self.model_path}")
 
         # Load model automatically
@@ -225,8 +374,16 @@ class RealYOLOModel:
                 print(f"❌ Model file not found: {self.model_path}")
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
 
-            print(f"📥 Loading YOLO model from {self.model_path}")
-            self.model = YOLO(self.model_path)
+            model_path = self.model_path
+            if USE_TENSORRT:
+                model_path = self._get_tensorrt_engine() or self.model_path
+            elif USE_ONNX:
+                model_path = self._get_onnx_model() or self.model_path
+
+            print(f"📥 Loading YOLO model from {model_path}")
+            self.model = YOLO(model_path, task="detect")
+            if str(model_path).endswith(".engine"):
+                self.max_batch = TENSORRT_MAX_BATCH
             self.is_loaded = True
             print(f"✅ YOLO model loaded successfully")
 
@@ -235,9 +392,90 @@ class RealYOLOModel:
             self.is_loaded = False
             raise
 
-    def predict(self, pil_image: Image.Image):
+    def _get_tensorrt_engine(self) -> Optional[str]:
+        """
+        Return the path of a TensorRT engine built from the .pt weights.
+        The engine is cached next to the weights and rebuilt only when the
+        weights are newer than it.
+        """
+        weights = Path(self.model_path)
+        engine_path = weights.with_suffix(".int8.engine" if USE_INT8 else ".engine")
+        try:
+            if (
+                engine_path.exists()
+                and engine_path.stat().st_mtime >= weights.stat().st_mtime
+            ):
+                return str(engine_path)
+
+            precision = "int8" if USE_INT8 else ("fp16" if USE_HALF else "fp32")
+            print(
+                f"🏗️ Building {precision} TensorRT engine for {weights.name} (one-time)..."
+            )
+            export_args = {}
+            if USE_INT8:
+                export_args = {"int8": True, "data": INT8_CALIBRATION_DATA}
+            exported = YOLO(str(weights)).export(
+                format="engine",
+                half=USE_HALF and not USE_INT8,
+                dynamic=True,
+                batch=TENSORRT_MAX_BATCH,
+                verbose=False,
+                **export_args,
+            )
+
+            # Ultralytics always writes <weights>.engine; keep INT8 separately
+            if Path(exported) != engine_path:
+                os.replace(exported, engine_path)
+            print(f"✅ TensorRT engine cached at {engine_path}")
+            return str(engine_path)
+
+        except Exception as e:
+            print(f"⚠️ TensorRT export failed, using PyTorch weights: {e}")
+            return None
+
+    def _get_onnx_model(self) -> Optional[str]:
+        """
+        Return the path of an ONNX export of the .pt weights (dynamic batch),
+        run by Ultralytics through ONNX Runtime on CPU. Cached next to the
+        weights like the TensorRT engine.
+        """
+        weights = Path(self.model_path)
+        onnx_path = weights.with_suffix(".onnx")
+        try:
+            if (
+                onnx_path.exists()
+                and onnx_path.stat().st_mtime >= weights.stat().st_mtime
+            ):
+                return str(onnx_path)
+
+            print(f"🏗️ Exporting {weights.name} to ONNX (one-time)...")
+            exported = YOLO(str(weights)).export(
+                format="onnx", dynamic=True, simplify=True, verbose=False
+            )
+            if Path(exported) != onnx_path:
+                os.replace(exported, onnx_path)
+            print(f"✅ ONNX model cached at {onnx_path}")
+            return str(onnx_path)
+
+        except Exception as e:
+            print(f"⚠️ ONNX export failed, using PyTorch weights: {e}")
+            return None
+
+    def warmup(self, runs: int = 1):
+        """Run dummy forward passes so CUDA init and cuDNN autotune happen now"""
+        if not self.is_loaded:
+            return
+
+        # Ultralytics letterboxes to the frame's aspect ratio, so cuDNN tunes a
+        # separate kernel set per input shape - warm the common webcam ones
+        for height, width in WARMUP_FRAME_SIZES:
+            dummy = np.zeros((height, width, 3), dtype=np.uint8)
+            for _ in range(runs):
+                self.model(dummy, verbose=False, half=USE_HALF)
+
+    def predict(self, pil_image: ImageInput):
         """
-        Predict drowsiness from PIL Image
+        Predict drowsiness from a PIL Image or an RGB uint8 array
 
         Returns:
             Tuple: (is_drowsy, confidence, bbox, class_name, class_id)
@@ -246,90 +484,150 @@ class RealYOLOModel:
             raise RuntimeError("Model not loaded")
 
         try:
-            # Convert PIL to numpy array for YOLO
-            import numpy as np
-
             # Keep as RGB (don't convert to BGR)
             # Ultralytics YOLO can accept PIL Image directly which preserves RGB
             # Or we can pass numpy array but need to ensure it stays RGB
-            img_array = np.array(pil_image)
+            # Pillow exports its pixels through tobytes() (one copy either way);
+            # np.asarray wraps that read-only buffer where np.array would copy
+            # it again, and passes ndarrays straight through
+            img_array = np.asarray(pil_image)
 
             # Run inference with RGB image (bgr=False ensures no BGR conversion during augmentation)
             # Note: During inference (predict), YOLO expects RGB by default when passing numpy arrays
-            results = self.model(img_array, verbose=False)
-
-            # Process results
-            if not results or len(results) == 0:
-                print("🤷‍♂️ No detections found")
-                return "safe", 0.0, None, "safe-driving", 4
-
-            # หา result ที่ดีที่สุด โดยพิจารณาว่ามี class ที่ไม่ใช่ safe_keywords หรือไม่
-            safe_keywords = ["safe-driving", "safe_driving", "safedriving", "seatbelt"]
-            
-            def get_best_result(results):
-                """เลือก result ที่ดีที่สุด โดยให้ความสำคัญกับ class ที่ไม่ใช่ safe_keywords"""
-                valid_results = [r for r in results if r.boxes is not None and len(r.boxes) > 0]
-                
-                if not valid_results:
-                    return None
-                
-                # หา result ที่มี non-safe class
-                for r in valid_results:
-                    class_names = r.names
-                    classes = r.boxes.cls.cpu().numpy()
-                    
-                    # เช็คว่ามี class ไหนที่ไม่ใช่ safe_keywords
-                    for cls_id in classes:
-                        class_name = class_names.get(int(cls_id), "").lower()
-                        if class_name not in safe_keywords:
-                            return r
-                
-                # ถ้าทุก class เป็น safe_keywords หรือไม่มีเลย ใช้ logic เดิม (result ที่มี boxes มากที่สุด)
-                return max(valid_results, key=lambda r: len(r.boxes))
-            
-            result = get_best_result(results)
-
-            if result is None or result.boxes is None or len(result.boxes) == 0:
-                print("🤷‍♂️ No bounding boxes found")
-                return "safe", 0.0, None, "safe-driving", 4
-
-            # Get the highest confidence detection
-            boxes = result.boxes
-            confidences = boxes.conf.cpu().numpy()
-            classes = boxes.cls.cpu().numpy()
-            xyxy = boxes.xyxy.cpu().numpy()
-
-            # Find best detection
-            best_idx = np.argmax(confidences)
-            best_conf = float(confidences[best_idx])
-            best_class = int(classes[best_idx])
-            best_box = xyxy[best_idx]
-
-            # Get class names mapping
-            class_names = result.names
-
-            class_name = class_names.get(best_class, "unknown")
-            # Determine drowsiness by class name
-            answer = map_class_name_to_status(class_name)
-
-            # Convert bbox format
-            x1, y1, x2, y2 = best_box
-            bbox = {
-                "x": int(x1),
-                "y": int(y1),
-                "width": int(x2 - x1),
-                "height": int(y2 - y1),
-            }
+            results = self.model(img_array, verbose=False, half=USE_HALF)
 
-            print(
-                f"🎯 YOLO Prediction: {class_name} (conf: {best_conf:.3f}, drowsy: {answer})"
-            )
-            return answer, best_conf, bbox, class_name, best_class
+            return self._parse_results(results)
 
         except Exception as e:
             print(f"❌ Error during YOLO inference: {e}")
             raise
 
+    def predict_batch(self, pil_images: List[ImageInput]):
+        """
+        Predict drowsiness for several images with a single YOLO forward pass
+
+        Returns:
+            List of tuples: (is_drowsy, confidence, bbox, class_name, class_id)
+        """
+        return [
+            prediction for prediction, _ in self.predict_batch_with_results(pil_images)
+        ]
+
+    def predict_batch_with_results(self, pil_images: List[ImageInput]):
+        """
+        Same as predict_batch, but also returns the raw Ultralytics Results
+        per image so callers can draw annotations without a second forward pass
+
+        Returns:
+            List of (prediction tuple, Results)
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+
+        try:
+            # Ultralytics letterboxes and stacks the list into one [N,3,H,W] batch
+            img_arrays = [np.asarray(pil_image) for pil_image in pil_images]
+            # Larger batches (BATCH_MAX_SIZE is not capped) are run in chunks
+            # the engine accepts
+            step = self.max_batch or max(len(img_arrays), 1)
+            results = []
+            for start in range(0, len(img_arrays), step):
+                results.extend(
+                    self.model(
+                        img_arrays[start : start + step], verbose=False, half=USE_HALF
+                    )
+                )
+
+            return [(self._parse_results([result]), result) for result in results]
+
+        except Exception as e:
+            print(f"❌ Error during YOLO batch inference: {e}")
+            raise
+
+    def _safe_class_ids(self, class_names: Dict[int, str]) -> frozenset:
+        """Class ids whose name is a SAFE_CLASS_KEYWORDS entry (built once)"""
+        if self._safe_ids is None:
+            self._safe_ids = frozenset(
+                class_id
+                for class_id, name in class_names.items()
+                if str(name).lower() in SAFE_CLASS_KEYWORDS
+            )
+        return self._safe_ids
+
+    def _parse_results(self, results):
+        """Convert Ultralytics results for one image into the prediction tuple"""
+        if not results or len(results) == 0:
+            logger.info("🤷‍♂️ No detections found")
+            return "safe", 0.0, None, "safe-driving", 4
+
+        # หา result ที่ดีที่สุด โดยพิจารณาว่ามี class ที่ไม่ใช่ safe_keywords หรือไม่
+        def get_best_result(results):
+            """เลือก result ที่ดีที่สุด โดยให้ความสำคัญกับ class ที่ไม่ใช่ safe_keywords"""
+            valid_results = [r for r in results if r.boxes is not None and len(r.boxes) > 0]
+
+            if not valid_results:
+                return None
+
+            # หา result ที่มี non-safe class - one set test per result
+            # instead of a name lookup per box
+            for r in valid_results:
+                if not set(r.boxes.cls.int().tolist()) <= self._safe_class_ids(r.names):
+                    return r
+
+            # ถ้าทุก class เป็น safe_keywords หรือไม่มีเลย ใช้ logic เดิม (result ที่มี boxes มากที่สุด)
+            return max(valid_results, key=lambda r: len(r.boxes))
+
+        result = get_best_result(results)
+
+        if result is None or result.boxes is None or len(result.boxes) == 0:
+            logger.info("🤷‍♂️ No bounding boxes found")
+            return "safe", 0.0, None, "safe-driving", 4
+
+        # Get the highest confidence detection (one device -> host copy)
+        boxes = result.boxes.cpu()
+        confidences = boxes.conf.numpy()
+        classes = boxes.cls.numpy()
+        xyxy = boxes.xyxy.numpy()
+
+        # Find best detection
+        best_idx = np.argmax(confidences)
+        best_conf = float(confidences[best_idx])
+        best_class = int(classes[best_idx])
+        best_box = xyxy[best_idx]
+
+        # Get class names mapping
+        class_names = result.names
+
+        class_name = class_names.get(best_class, "unknown")
+        # Determine drowsiness by class name
+        answer = map_class_name_to_status(class_name)
+
+        # Convert bbox format
+        x1, y1, x2, y2 = best_box
+        bbox = {
+            "x": int(x1),
+            "y": int(y1),
+            "width": int(x2 - x1),
+            "height": int(y2 - y1),
+        }
+
+        # Per-frame logs use lazy %-args: nothing is formatted below INFO
+        logger.info(
+            "🎯 YOLO Prediction: %s (conf: %.3f, drowsy: %s)",
+            class_name,
+            best_conf,
+            answer,
+        )
+        return answer, best_conf, bbox, class_name, best_class
+
+
+# model="auto": cheapest model first; escalate to the next one only when the
+# confidence is ambiguous (within AUTO_CONFIDENCE_MARGIN of 0.5).
+# Faster R-CNN stays out until it has a label -> class-name map: its
+# class_name is the raw label id, so it could never override YOLO and every
+# escalation would be a wasted forward pass.
+AUTO_MODEL_CASCADE = ("yolo",)
+AUTO_CONFIDENCE_MARGIN = 0.3
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]  # Go up 3 levels: models -> backend -> src -> root
 DEFAULT_MODEL_DIR = Path(os.getenv("MODEL_DIR", PROJECT_ROOT / "models" / "weights")).resolve()
@@ -393,23 +691,21 @@ class RealModelLoader:
             print(f"❌ Error loading real models: {e}")
             # Don't raise - allow fallback to mock models
 
+    @torch.inference_mode()
+    def warmup(self, runs: int = 1):
+        """Warm up every loaded model so the first request hits a hot path"""
+        for name, model in self.models.items():
+            try:
+                start = time.perf_counter()
+                model.warmup(runs)
+                print(f"🔥 Warmed up {name} in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                print(f"⚠️ Warm-up failed for {name}: {e}")
+
     def get_model(self, model_name: str) -> Optional[Any]:
         """Get a specific model by name"""
-        # Direct model mapping first
-        if model_name in self.models:
-            return self.models[model_name]
-
-        # Fallback mapping for common requests
-        name_mapping = {
-            "yolo": "yolo" if "yolo" in self.models else None,
-        }
-
-        mapped_name = name_mapping.get(model_name)
-        if mapped_name and mapped_name in self.models:
-            return self.models[mapped_name]
-
-        # No fallback to other architectures when only YOLO is supported
-        return None
+        # Names map 1:1 onto loaded models - no fallback to other architectures
+        return self.models.get(model_name)
 
     def get_all_models(self) -> Dict:
         """Get information about all loaded models"""
@@ -460,32 +756,135 @@ class RealModelLoader:
             "device": str(getattr(model, "device", "cpu")),
         }
 
+    @torch.inference_mode()
     def detect_drowsiness(self, image, model_name: str = "yolo"):
         """
         Perform drowsiness detection using real trained model
         Returns standardized best_idx format
         """
+        if model_name == "auto":
+            return self._detect_auto([image])[0]
+
         model: RealYOLOModel = self.get_model(model_name)
         if not model:
             raise ValueError(f"Model '{model_name}' not found")
 
         try:
-            answer, confidence, bbox, class_name, class_id = model.predict(image)
-            print(f"Detection results - Category: {answer}, Confidence: {confidence}")
-            return {
-                "is_drowsy": answer,  # Now returns 4-class category: "drowsy", "distracted", "safety-violation", "safe"
-                "confidence": confidence,
-                "class_name": class_name,
-                "class_id": class_id,
-                "bbox": bbox,
-                "model_used": model.name,
-                "timestamp": datetime.now().isoformat(),
-            }
+            with INFERENCE_SLOTS, model.lock:
+                answer, confidence, bbox, class_name, class_id = model.predict(image)
+            logger.info(
+                "Detection results - Category: %s, Confidence: %s", answer, confidence
+            )
+            return self._build_result(
+                model, answer, confidence, bbox, class_name, class_id
+            )
 
         except Exception as e:
-            logger.error(f"Error during {model_name} detection: {e}")
+            logger.error("Error during %s detection: %s", model_name, e)
             raise
 
+    @torch.inference_mode()
+    def detect_batch(self, images: List[Any], model_name: str = "yolo") -> List[Dict]:
+        """
+        Perform drowsiness detection on several images in one forward pass
+        Returns a list of results in the same format as detect_drowsiness
+        """
+        if model_name == "auto":
+            return self._detect_auto(images)
+
+        model: RealYOLOModel = self.get_model(model_name)
+        if not model:
+            raise ValueError(f"Model '{model_name}' not found")
+
+        if not images:
+            return []
+
+        try:
+            if isinstance(model, RealYOLOModel):
+                # Keep the Results so the API can plot them (no second pass)
+                with INFERENCE_SLOTS, model.lock:
+                    predictions = model.predict_batch_with_results(images)
+                # One forward pass - one timestamp shared by the whole batch
+                timestamp = datetime.now().isoformat()
+                return [
+                    self._build_result(
+                        model, *prediction, raw_result=raw_result, timestamp=timestamp
+                    )
+                    for prediction, raw_result in predictions
+                ]
+
+            with INFERENCE_SLOTS, model.lock:
+                predictions = model.predict_batch(images)
+            timestamp = datetime.now().isoformat()
+            return [
+                self._build_result(model, *prediction, timestamp=timestamp)
+                for prediction in predictions
+            ]
+
+        except Exception as e:
+            logger.error("Error during %s batch detection: %s", model_name, e)
+            raise
+
+    def _detect_auto(self, images: List[Any]) -> List[Dict]:
+        """
+        Early-exit cascade over AUTO_MODEL_CASCADE: every image goes through
+        the cheapest loaded model; only images whose confidence is ambiguous
+        are sent on to the next (heavier) model. An escalated model's answer
+        replaces the earlier one only when it is a real detection whose class
+        maps to a known category (see _is_mapped_detection) - confidences of
+        different models are not comparable, and neither an unmapped label nor
+        a no-detection "safe-driving" fallback may overrule an ambiguous
+        "drowsy" frame.
+        """
+        results: List[Optional[Dict]] = [None] * len(images)
+        pending = list(range(len(images)))
+
+        for name in AUTO_MODEL_CASCADE:
+            if name not in self.models or not pending:
+                continue
+
+            candidates = self.detect_batch([images[i] for i in pending], name)
+            ambiguous = []
+            for i, candidate in zip(pending, candidates):
+                if results[i] is None or _is_mapped_detection(candidate):
+                    results[i] = candidate
+                if abs(results[i]["confidence"] - 0.5) <= AUTO_CONFIDENCE_MARGIN:
+                    ambiguous.append(i)
+            pending = ambiguous
+
+        if any(result is None for result in results):
+            raise ValueError("No models loaded for auto selection")
+        return results
+
+    def _build_result(
+        self,
+        model,
+        answer,
+        confidence,
+        bbox,
+        class_name,
+        class_id,
+        raw_result=None,
+        timestamp=None,
+    ):
+        """
+        Standardized detection result dict. "raw_result" (YOLO only) holds the
+        Ultralytics Results for annotation - pop it before caching/serializing.
+        Batches pass one preformatted `timestamp` for all of their results.
+        """
+        result = {
+            "is_drowsy": answer,  # Now returns 4-class category: "drowsy", "distracted", "safety-violation", "safe"
+            "confidence": confidence,
+            "class_name": class_name,
+            "class_id": class_id,
+            "bbox": bbox,
+            "model_used": model.name,
+            "timestamp": timestamp or datetime.now().isoformat(),
+        }
+        if raw_result is not None:
+            result["raw_result"] = raw_result
+        return result
+
 
 # Global model loader instance
 real_model_loader = RealModelLoader()
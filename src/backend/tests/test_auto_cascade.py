@@ -0,0 +1,41 @@
+from backend.models import real_model_loader as rml
+
+
+def _result(class_name, confidence, bbox=True):
+    return {
+        "is_drowsy": rml.map_class_name_to_status(class_name),
+        "confidence": confidence,
+        "class_name": class_name,
+        "bbox": {"x": 0, "y": 0, "width": 10, "height": 10} if bbox else None,
+    }
+
+
+def _loader(answers):
+    # answers: model name -> result returned for every image
+    loader = rml.RealModelLoader.__new__(rml.RealModelLoader)
+    loader.models = dict.fromkeys(answers)
+    loader.detect_batch = lambda images, name: [dict(answers[name]) for _ in images]
+    return loader
+
+
+def test_escalation_keeps_drowsy_over_no_detection_and_unmapped_label(monkeypatch):
+    monkeypatch.setattr(rml, "AUTO_MODEL_CASCADE", ("yolo", "faster_rcnn"))
+    ambiguous_drowsy = _result("drowsy", 0.6)
+
+    # Faster R-CNN found nothing: "safe-driving" fallback without a bbox
+    no_detection = _result("safe-driving", 0.0, bbox=False)
+    loader = _loader({"yolo": ambiguous_drowsy, "faster_rcnn": no_detection})
+    assert loader._detect_auto(["frame"])[0]["is_drowsy"] == "drowsy"
+
+    # Faster R-CNN detection with a raw label id (no class-name map)
+    unmapped = _result("3", 0.95)
+    loader = _loader({"yolo": ambiguous_drowsy, "faster_rcnn": unmapped})
+    assert loader._detect_auto(["frame"])[0]["is_drowsy"] == "drowsy"
+
+
+def test_escalation_accepts_mapped_detection(monkeypatch):
+    monkeypatch.setattr(rml, "AUTO_MODEL_CASCADE", ("yolo", "faster_rcnn"))
+    loader = _loader(
+        {"yolo": _result("drowsy", 0.6), "faster_rcnn": _result("safe_driving", 0.9)}
+    )
+    assert loader._detect_auto(["frame"])[0]["class_name"] == "safe_driving"
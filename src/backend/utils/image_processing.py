@@ -3,10 +3,11 @@
 
 import base64
 import io
+import struct
 import numpy as np
 from PIL import Image
 import logging
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, Union
 
 # Try to import cv2 (OpenCV) - make it optional
 try:
@@ -17,6 +18,26 @@ except ImportError:
     CV2_AVAILABLE = False
     print("⚠️ OpenCV (cv2) not available - some features may be limited")
 
+# Prefer the SIMD (AVX2/SSSE3) base64 decoder when installed - same API as stdlib
+try:
+    import pybase64 as b64
+
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    b64 = base64
+    PYBASE64_AVAILABLE = False
+
+# libjpeg-turbo (SIMD IDCT / color convert) for JPEG frames - optional
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+
+    # One decoder instance, shared across request threads
+    tj = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):
+    tj = None
+    TURBOJPEG_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +49,112 @@ class ImageProcessor:
         self.max_image_size = (1920, 1080)  # Max resolution
         self.min_image_size = (64, 64)  # Min resolution
 
+    def decode_base64(self, base64_string: Union[str, bytes]) -> bytes:
+        """
+        Decode base64 string (optionally with data URL prefix) to raw bytes
+
+        Args:
+            base64_string: Base64 encoded string, e.g. "data:image/jpeg;base64,..."
+
+        Returns:
+            Decoded bytes
+        """
+        # Decode from ASCII bytes: pybase64 takes a much slower path for str.
+        # The data URL prefix (if present) is skipped with a memoryview slice
+        # instead of copying the multi-MB payload.
+        if isinstance(base64_string, str):
+            base64_string = base64_string.encode("ascii")
+        comma = base64_string.rfind(b",")
+        return b64.b64decode(memoryview(base64_string)[comma + 1 :], validate=False)
+
+    def open_image(
+        self, image_data: bytes, draft_size: Optional[Tuple[int, int]] = None
+    ) -> Image.Image:
+        """
+        Decode raw image bytes to a PIL image
+
+        JPEG frames go through libjpeg-turbo when PyTurboJPEG is installed;
+        everything else (PNG, WEBP, ...) falls back to PIL.
+
+        With `draft_size`, large JPEGs are decoded at 1/2, 1/4 or 1/8 scale
+        inside libjpeg (DCT-domain downscaling), never smaller than
+        `draft_size`. The full-resolution size is then kept in
+        `image.info["original_size"]` - see `scale_bbox`.
+
+        Args:
+            image_data: Encoded image bytes
+            draft_size: Optional (width, height) the model needs at least
+
+        Returns:
+            PIL image (JPEG frames are fully decoded, RGB)
+        """
+        is_jpeg = self._sniff_format(image_data) == "JPEG"
+
+        if TURBOJPEG_AVAILABLE and is_jpeg:
+            try:
+                scaling_factor = None
+                if draft_size:
+                    width, height, _, _ = tj.decode_header(image_data)
+                    reduce = self._draft_reduce((width, height), draft_size)
+                    if reduce > 1:
+                        scaling_factor = (1, reduce)
+                pil_image = Image.fromarray(
+                    tj.decode(
+                        image_data,
+                        pixel_format=TJPF_RGB,
+                        scaling_factor=scaling_factor,
+                    )
+                )
+                pil_image.format = "JPEG"
+                if scaling_factor:
+                    pil_image.info["original_size"] = (width, height)
+                return pil_image
+            except Exception as e:
+                logger.debug("TurboJPEG decode failed, falling back to PIL: %s", e)
+
+        pil_image = Image.open(io.BytesIO(image_data))
+        if draft_size and is_jpeg:
+            original_size = pil_image.size
+            pil_image.draft("RGB", draft_size)
+            if pil_image.size != original_size:
+                pil_image.info["original_size"] = original_size
+        return pil_image
+
+    @staticmethod
+    def _draft_reduce(size: Tuple[int, int], draft_size: Tuple[int, int]) -> int:
+        """Largest JPEG reduction (8, 4, 2 or 1) keeping size >= draft_size"""
+        # Same rule PIL's JpegImageFile.draft() uses
+        scale = min(size[0] // draft_size[0], size[1] // draft_size[1])
+        for reduce in (8, 4, 2):
+            if scale >= reduce:
+                return reduce
+        return 1
+
+    @staticmethod
+    def scale_bbox(
+        bbox: dict, from_size: Tuple[int, int], to_size: Tuple[int, int]
+    ) -> dict:
+        """
+        Map an {x, y, width, height} bbox between two resolutions of one image
+
+        Args:
+            bbox: Bounding box in `from_size` pixel coordinates
+            from_size: (width, height) the bbox was measured on
+            to_size: (width, height) to express it in
+
+        Returns:
+            New bbox dict in `to_size` pixel coordinates
+        """
+        sx = to_size[0] / from_size[0]
+        sy = to_size[1] / from_size[1]
+        return {
+            **bbox,
+            "x": int(bbox.get("x", 0) * sx),
+            "y": int(bbox.get("y", 0) * sy),
+            "width": int(bbox.get("width", 0) * sx),
+            "height": int(bbox.get("height", 0) * sy),
+        }
+
     def decode_base64_image(self, base64_string: str) -> Optional[np.ndarray]:
         """
         Decode base64 string to OpenCV image (numpy array)
@@ -39,19 +166,17 @@ class ImageProcessor:
             OpenCV image array or None if failed
         """
         try:
-            # Remove data URL prefix if present
-            if "," in base64_string:
-                base64_string = base64_string.split(",")[1]
+            image_data = self.decode_base64(base64_string)
 
-            # Decode base64
-            image_data = base64.b64decode(base64_string)
+            if CV2_AVAILABLE:
+                return self._decode_with_cv2(image_data)
 
             # Convert to PIL Image
             pil_image = Image.open(io.BytesIO(image_data))
 
             # Validate image format
             if pil_image.format not in self.supported_formats:
-                logger.warning(f"Unsupported image format: {pil_image.format}")
+                logger.warning("Unsupported image format: %s", pil_image.format)
                 return None
 
             # Validate image size
@@ -62,7 +187,7 @@ class ImageProcessor:
                 or width > self.max_image_size[0]
                 or height > self.max_image_size[1]
             ):
-                logger.warning(f"Image size {width}x{height} outside valid range")
+                logger.warning("Image size %sx%s outside valid range", width, height)
 
             # Convert to RGB if needed
             if pil_image.mode in ["RGBA", "LA"]:
@@ -80,13 +205,148 @@ class ImageProcessor:
             # YOLO models can handle RGB directly, no need to convert to BGR
             rgb_image = np.array(pil_image)
 
-            logger.info(f"Successfully decoded image: {rgb_image.shape}")
+            logger.info("Successfully decoded image: %s", rgb_image.shape)
             return rgb_image
 
         except Exception as e:
-            logger.error(f"Error decoding base64 image: {e}")
+            logger.error("Error decoding base64 image: %s", e)
+            return None
+
+    def _decode_with_cv2(self, image_data: bytes) -> Optional[np.ndarray]:
+        """Decode image bytes straight into a numpy array (no PIL round-trip)"""
+        image_format = self._sniff_format(image_data)
+        if image_format not in self.supported_formats:
+            logger.warning("Unsupported image format: %s", image_format)
             return None
 
+        bgr_image = cv2.imdecode(
+            np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR
+        )
+        if bgr_image is None:
+            logger.error("cv2.imdecode failed to decode image data")
+            return None
+
+        height, width = bgr_image.shape[:2]
+        if (
+            width < self.min_image_size[0]
+            or height < self.min_image_size[1]
+            or width > self.max_image_size[0]
+            or height > self.max_image_size[1]
+        ):
+            logger.warning("Image size %sx%s outside valid range", width, height)
+
+        # Keep RGB format for YOLO - convert in place, no second frame buffer
+        rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB, dst=bgr_image)
+
+        logger.info("Successfully decoded image: %s", rgb_image.shape)
+        return rgb_image
+
+    @staticmethod
+    def _sniff_format(image_data: bytes) -> Optional[str]:
+        """Detect image format from magic bytes"""
+        if image_data[:3] == b"\xff\xd8\xff":
+            return "JPEG"
+        if image_data[:8] == b"\x89PNG\r\n\x1a\n":
+            return "PNG"
+        if image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
+            return "WEBP"
+        return None
+
+    def sniff_image(self, image_data: bytes) -> Tuple[str, int, int]:
+        """
+        Read format and dimensions from the image header without decoding
+
+        JPEG / PNG / WEBP headers are parsed directly; other formats fall back
+        to PIL's (lazy, header-only) Image.open.
+
+        Args:
+            image_data: Encoded image bytes
+
+        Returns:
+            Tuple: (format, width, height)
+
+        Raises:
+            ValueError: if the bytes are not a readable image
+        """
+        image_format = self._sniff_format(image_data)
+        size = None
+        try:
+            if image_format == "JPEG":
+                size = self._jpeg_size(image_data)
+            elif image_format == "PNG":
+                size = struct.unpack(">II", image_data[16:24])
+            elif image_format == "WEBP":
+                size = self._webp_size(image_data)
+        except struct.error:
+            size = None
+
+        if size is None:
+            try:
+                with Image.open(io.BytesIO(image_data)) as pil_image:
+                    return (pil_image.format, *pil_image.size)
+            except Exception as e:
+                raise ValueError(f"Unreadable image header: {e}") from e
+
+        return (image_format, *size)
+
+    @staticmethod
+    def _jpeg_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+        """Walk JPEG marker segments up to the first SOFn frame header"""
+        i = 2
+        while i + 9 <= len(image_data):
+            if image_data[i] != 0xFF:
+                return None
+            marker = image_data[i + 1]
+            if marker == 0xFF:  # fill byte
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # no length field
+                i += 2
+                continue
+            # SOF0-SOF15, excluding DHT / JPG / DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", image_data[i + 5 : i + 9])
+                return width, height
+            (segment_length,) = struct.unpack(">H", image_data[i + 2 : i + 4])
+            i += 2 + segment_length
+        return None
+
+    @staticmethod
+    def _webp_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+        """Read canvas size from the first WEBP chunk (VP8 / VP8L / VP8X)"""
+        if len(image_data) < 30:
+            return None
+        chunk = image_data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", image_data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(image_data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            width = int.from_bytes(image_data[24:27], "little") + 1
+            height = int.from_bytes(image_data[27:30], "little") + 1
+            return width, height
+        return None
+
+    def dhash(self, pil_image: Image.Image, hash_size: int = 8) -> int:
+        """
+        Perceptual difference hash (dHash) of an image
+
+        Args:
+            pil_image: PIL image
+            hash_size: Hash grid size (hash has hash_size**2 bits)
+
+        Returns:
+            Hash as an int; similar images differ in only a few bits
+        """
+        small = pil_image.convert("L").resize(
+            (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+        )
+        pixels = np.asarray(small, dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
     def preprocess_for_model(self, image: np.ndarray, model_name: str) -> np.ndarray:
         """
         Preprocess image for specific model requirements
@@ -103,7 +363,7 @@ class ImageProcessor:
             return self._preprocess_yolo(image)
 
         except Exception as e:
-            logger.error(f"Error preprocessing image for {model_name}: {e}")
+            logger.error("Error preprocessing image for %s: %s", model_name, e)
             return image
 
     def _preprocess_yolo(self, image: np.ndarray) -> np.ndarray:
@@ -119,18 +379,23 @@ class ImageProcessor:
         # Resize image
         resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
 
-        # Create padded image
-        padded = np.full((*target_size, 3), 114, dtype=np.uint8)  # Gray padding
-
-        # Center the resized image
-        y_offset = (target_size[1] - new_h) // 2
-        x_offset = (target_size[0] - new_w) // 2
-        padded[y_offset : y_offset + new_h, x_offset : x_offset + new_w] = resized
-
-        # Normalize to [0, 1] and convert to float32
-        padded = padded.astype(np.float32) / 255.0
-
-        logger.debug(f"YOLO preprocessing: {image.shape} -> {padded.shape}")
+        # Center the resized image with gray (114) padding in a single border op
+        top = (target_size[1] - new_h) // 2
+        left = (target_size[0] - new_w) // 2
+        padded = cv2.copyMakeBorder(
+            resized,
+            top,
+            target_size[1] - new_h - top,
+            left,
+            target_size[0] - new_w - left,
+            cv2.BORDER_CONSTANT,
+            value=(114, 114, 114),
+        )
+
+        # Normalize to [0, 1] float32 in one pass (no astype temporary)
+        padded = np.multiply(padded, np.float32(1.0 / 255.0), dtype=np.float32)
+
+        logger.debug("YOLO preprocessing: %s -> %s", image.shape, padded.shape)
         return padded
 
     # Note: Additional preprocessors for future models can be added here
@@ -139,9 +404,9 @@ class ImageProcessor:
         """Default preprocessing - basic normalization"""
         # Simple resize and normalize
         resized = cv2.resize(image, (416, 416), interpolation=cv2.INTER_LINEAR)
-        normalized = resized.astype(np.float32) / 255.0
+        normalized = np.multiply(resized, np.float32(1.0 / 255.0), dtype=np.float32)
 
-        logger.debug(f"Default preprocessing: {image.shape} -> {normalized.shape}")
+        logger.debug("Default preprocessing: %s -> %s", image.shape, normalized.shape)
         return normalized
 
     def validate_image(self, image: np.ndarray) -> Tuple[bool, str]:
@@ -206,7 +471,7 @@ class ImageProcessor:
                 "max_value": int(np.max(image)),
             }
         except Exception as e:
-            logger.error(f"Error getting image info: {e}")
+            logger.error("Error getting image info: %s", e)
             return {}
 
     def resize_image(
@@ -236,5 +501,5 @@ class ImageProcessor:
                 return cv2.resize(image, target_size, interpolation=cv2.INTER_LINEAR)
 
         except Exception as e:
-            logger.error(f"Error resizing image: {e}")
+            logger.error("Error resizing image: %s", e)
             return image
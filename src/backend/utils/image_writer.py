@@ -0,0 +1,86 @@
+# Image Writer
+# Background thread that renders and saves annotated images off the request path
+
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Zero-argument callable returning the annotated PIL image to save
+RenderFn = Callable[[], Image.Image]
+
+
+class ImageWriter:
+    """
+    Saves annotated detection images from a single daemon thread.
+
+    Request threads hand over the target path and a render callable
+    (e.g. `lambda: _draw_detections(raw_result)`), so both drawing and JPEG
+    encoding/disk I/O happen after the response is sent. Each pending render
+    holds its full-resolution frame (or Ultralytics Results), so the queue is
+    kept short: when disk falls behind, new saves are dropped rather than
+    letting pending frames pile up in memory.
+    """
+
+    def __init__(self, max_pending: int = 32, quality: int = 95):
+        self.quality = quality
+        self._queue: "queue.Queue[Tuple[str, RenderFn]]" = queue.Queue(
+            maxsize=max_pending
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, save_path: str, render: RenderFn) -> bool:
+        """
+        Queue an image for saving without blocking.
+
+        Args:
+            save_path: Destination file path
+            render: Callable producing the PIL image to write
+
+        Returns:
+            False if the queue is full and the image was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((save_path, render))
+            return True
+        except queue.Full:
+            logger.warning("Image writer queue full, dropping %s", save_path)
+            return False
+
+    def join(self):
+        """Block until every queued image has been written"""
+        self._queue.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="image-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            save_path, render = self._queue.get()
+            try:
+                image = render()
+                try:
+                    image.save(save_path, quality=self.quality)
+                except FileNotFoundError:
+                    # Output directory is created lazily (or was removed)
+                    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+                    image.save(save_path, quality=self.quality)
+                logger.info("✅ Saved annotated image to %s", save_path)
+            except Exception as e:
+                logger.error("❌ Failed to save annotated image %s: %s", save_path, e)
+            finally:
+                self._queue.task_done()
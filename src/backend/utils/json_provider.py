@@ -0,0 +1,44 @@
+# JSON Provider
+# Flask JSON provider backed by orjson (falls back to Flask's default)
+
+from typing import Any
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("⚠️ orjson not available - using stdlib json for API payloads")
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Drop-in replacement for Flask's JSON provider.
+
+    Used by `jsonify(...)` and `request.get_json()`, so routes keep the
+    usual Flask API while parsing / serialization runs in orjson.
+    numpy scalars and arrays are serialized natively.
+    """
+
+    if ORJSON_AVAILABLE:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+        def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+            return orjson.loads(s)
+
+        def response(self, *args: Any, **kwargs: Any):
+            # Skip the bytes -> str -> bytes round-trip of the default provider
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(
+                orjson.dumps(obj, default=self.default, option=self.options),
+                mimetype=self.mimetype,
+            )
@@ -29,7 +29,15 @@ class ResponseFormatter:
         """
         try:
             # Generate unique ID for this detection
-            detection_id = f"{detection_result['model_used']}_{int(datetime.utcnow().timestamp() * 1000)}"
+            now = datetime.utcnow()
+            detection_id = (
+                f"{detection_result['model_used']}_{int(now.timestamp() * 1000)}"
+            )
+
+            # The model loader always stamps results - only format a fallback
+            timestamp = detection_result.get("timestamp")
+            if timestamp is None:
+                timestamp = now.isoformat()
 
             # Determine alert level and message
             is_drowsy = detection_result.get("is_drowsy", False)
@@ -44,9 +52,7 @@ class ResponseFormatter:
 
             response = {
                 "id": detection_id,
-                "timestamp": detection_result.get(
-                    "timestamp", datetime.utcnow().isoformat()
-                ),
+                "timestamp": timestamp,
                 "isDrowsy": is_drowsy,
                 "confidence": round(confidence, 3),
                 "className": class_name,
@@ -82,7 +88,7 @@ class ResponseFormatter:
             return response
 
         except Exception as e:
-            logger.error(f"Error formatting detection response: {e}")
+            logger.error("Error formatting detection response: %s", e)
             return self.format_error_response("Failed to format detection response")
 
     def format_batch_response(
@@ -134,7 +140,7 @@ class ResponseFormatter:
             return response
 
         except Exception as e:
-            logger.error(f"Error formatting batch response: {e}")
+            logger.error("Error formatting batch response: %s", e)
             return self.format_error_response("Failed to format batch response")
 
     def format_health_response(
@@ -167,7 +173,7 @@ class ResponseFormatter:
             return response
 
         except Exception as e:
-            logger.error(f"Error formatting health response: {e}")
+            logger.error("Error formatting health response: %s", e)
             return self.format_error_response("Failed to format health response")
 
     def format_models_response(
@@ -197,7 +203,7 @@ class ResponseFormatter:
             return response
 
         except Exception as e:
-            logger.error(f"Error formatting models response: {e}")
+            logger.error("Error formatting models response: %s", e)
             return self.format_error_response("Failed to format models response")
 
     def format_session_response(
@@ -238,7 +244,7 @@ class ResponseFormatter:
             return response
 
         except Exception as e:
-            logger.error(f"Error formatting session response: {e}")
+            logger.error("Error formatting session response: %s", e)
             return self.format_error_response("Failed to format session response")
 
     def format_error_response(
@@ -0,0 +1,231 @@
+# Result Cache
+# Bounded LRU of detection results for repeated / near-duplicate frames
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import logging
+
+# xxh3 (SIMD) hashes frames several times faster than BLAKE2b - optional
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Redis lets several worker processes / hosts share one result cache - optional
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class PerceptualResultCache:
+    """
+    LRU + TTL cache of model results keyed by (session_id, model_name,
+    perceptual hash).
+
+    A lookup hits when a cached hash from the same session and model is
+    within `max_distance` bits (Hamming distance), so consecutive frames of a
+    driver who isn't moving reuse the previous result instead of running
+    the model again. Entries expire `ttl` seconds after they were stored and
+    a hit does not refresh them, so a changing scene is re-checked at least
+    once per `ttl` even when its hash barely moves.
+    """
+
+    def __init__(self, maxsize: int = 256, max_distance: int = 5, ttl: float = 1.0):
+        self.maxsize = maxsize
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, Dict]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, session_id: str, model_name: str, image_hash: int) -> Optional[Dict]:
+        """Return a copy of the cached result for a similar, fresh frame, if any"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            key = self._find(session_id, model_name, image_hash)
+            if key is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return dict(self._entries[key][1])
+
+    def put(self, session_id: str, model_name: str, image_hash: int, result: Dict):
+        """Store a copy of a model result"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            key = (session_id, model_name, image_hash)
+            self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _find(
+        self, session_id: str, model_name: str, image_hash: int
+    ) -> Optional[Tuple[str, str, int]]:
+        now = time.monotonic()
+
+        # Most recent entries are the likeliest near-duplicates
+        for cached_key in reversed(self._entries):
+            session, name, cached_hash = cached_key
+            if (
+                session == session_id
+                and name == model_name
+                and self._entries[cached_key][0] >= now
+                and bin(cached_hash ^ image_hash).count("1") <= self.max_distance
+            ):
+                return cached_key
+        return None
+
+
+class ContentResultCache:
+    """
+    LRU + TTL cache of model results keyed by (model_name, 128-bit xxh3 digest
+    of the raw image bytes - BLAKE2b when xxhash is not installed).
+
+    Exact duplicates (client retries, replayed frames, health automation)
+    hit before the image is even decoded. Entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    @staticmethod
+    def digest(image_bytes: bytes) -> bytes:
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_128_digest(image_bytes)
+        return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+    def get(self, model_name: str, image_digest: bytes) -> Optional[Dict]:
+        """Return a copy of the cached result for identical bytes, if fresh"""
+        if not self.enabled:
+            return None
+
+        key = (model_name, image_digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, model_name: str, image_digest: bytes, result: Dict):
+        """Store a copy of a model result"""
+        if not self.enabled:
+            return
+
+        key = (model_name, image_digest)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisResultCache:
+    """
+    Exact-bytes result cache stored in Redis, shared by every worker process
+    (and host) - same interface as ContentResultCache.
+
+    Keys are "det:<model_name>:<digest hex>" with a TTL, values are JSON.
+    Redis errors are logged and treated as a miss, so a cache outage never
+    fails a detection.
+    """
+
+    def __init__(self, url: str, ttl: float = 30.0, prefix: str = "det"):
+        self.ttl = ttl
+        self.prefix = prefix
+        # Short timeouts: a slow cache must not cost more than the model
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=0.1, socket_connect_timeout=0.1
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    digest = staticmethod(ContentResultCache.digest)
+
+    def _key(self, model_name: str, image_digest: bytes) -> str:
+        return f"{self.prefix}:{model_name}:{image_digest.hex()}"
+
+    def get(self, model_name: str, image_digest: bytes) -> Optional[Dict]:
+        """Return the cached result for identical bytes, if any"""
+        try:
+            payload = self._client.get(self._key(model_name, image_digest))
+        except redis.RedisError as e:
+            logger.warning("Redis result cache unavailable: %s", e)
+            return None
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(payload)
+
+    def put(self, model_name: str, image_digest: bytes, result: Dict):
+        """Store a model result with the cache TTL"""
+        try:
+            self._client.set(
+                self._key(model_name, image_digest),
+                json.dumps(result),
+                px=int(self.ttl * 1000),
+            )
+        except redis.RedisError as e:
+            logger.warning("Redis result cache unavailable: %s", e)
+
+    def clear(self):
+        try:
+            for key in self._client.scan_iter(match=f"{self.prefix}:*"):
+                self._client.delete(key)
+        except redis.RedisError as e:
+            logger.warning("Redis result cache unavailable: %s", e)